@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+DigiManifest achievement engine test suite
+Drives AchievementEngine.apply directly and replays a backfill against the SQLite backend
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import uuid
+from datetime import datetime, timedelta
+
+import server
+from server import AchievementEngine
+from storage import SQLiteStorage
+
+START = datetime(2024, 1, 1, 12, 0)
+
+
+def ids(unlocked):
+    return [a["id"] for a in unlocked]
+
+
+class AchievementTester:
+    def __init__(self, storage):
+        self.storage = storage
+        self.tests_run = 0
+        self.tests_passed = 0
+
+    def log_test(self, name, success, details=""):
+        """Log test results"""
+        self.tests_run += 1
+        if success:
+            self.tests_passed += 1
+            print(f"✅ {name} - PASSED {details}")
+        else:
+            print(f"❌ {name} - FAILED {details}")
+        return success
+
+    def test_streaks(self):
+        state = AchievementEngine.new_state()
+        first = AchievementEngine.apply(state, "generate", 1.0, "2024-01-01")
+        self.log_test("First Generate", ids(first) == ["first_manifestation"] and state["streak"] == 1)
+
+        AchievementEngine.apply(state, "generate", 1.0, "2024-01-01")
+        self.log_test("Same Day Keeps Streak", state["streak"] == 1 and state["last_day"] == "2024-01-01")
+
+        AchievementEngine.apply(state, "generate", 1.0, "2024-01-02")
+        unlocked = AchievementEngine.apply(state, "generate", 1.0, "2024-01-03")
+        self.log_test("Next Day Extends Streak", state["streak"] == 3 and ids(unlocked) == ["streak_3"], f"Streak: {state['streak']}")
+
+        # Month and year boundaries are calendar days apart, not string neighbours
+        state = AchievementEngine.new_state()
+        for day in ("2023-12-30", "2023-12-31", "2024-01-01", "2024-02-29"):
+            AchievementEngine.apply(state, "generate", 1.0, day)
+        self.log_test("Gap Resets Streak", state["streak"] == 1 and state["last_day"] == "2024-02-29", f"Streak: {state['streak']}")
+
+        AchievementEngine.apply(state, "generate", 1.0, "2024-03-01")
+        self.log_test("Leap Day Rollover", state["streak"] == 2, f"Streak: {state['streak']}")
+
+    def test_thresholds(self):
+        state = AchievementEngine.new_state()
+        unlocked = AchievementEngine.apply(state, "generate", 15000.0, "2024-01-01")
+        self.log_test("Several Thresholds In One Event",
+                      ids(unlocked) == ["first_manifestation", "manifested_1k", "manifested_10k"], f"Unlocked: {ids(unlocked)}")
+
+        unlocked = AchievementEngine.apply(state, "generate", 1.0, "2024-01-01")
+        self.log_test("Unlocked Once", unlocked == [] and state["next_rule"]["total_manifested"] == 3)
+
+        state = AchievementEngine.new_state(["manifested_1k"])
+        unlocked = AchievementEngine.apply(state, "generate", 2000.0, "2024-01-01")
+        self.log_test("Existing Achievements Skipped", ids(unlocked) == ["first_manifestation"], f"Unlocked: {ids(unlocked)}")
+
+        unlocked = []
+        for _ in range(10):
+            unlocked += AchievementEngine.apply(state, "session")
+        unlocked += AchievementEngine.apply(state, "affirmation")
+        self.log_test("Session And Affirmation Rules", ids(unlocked) == ["sessions_10", "first_affirmation"], f"Unlocked: {ids(unlocked)}")
+
+        try:
+            AchievementEngine.apply(state, "unknown")
+            self.log_test("Unknown Event Rejected", False)
+        except ValueError:
+            self.log_test("Unknown Event Rejected", True)
+
+    def test_seeding(self):
+        user = {
+            "user_id": "seeded",
+            "stats": {"total_manifested": 950.0, "consecutive_days": 2, "last_usage_date": "2024-01-02", "sessions_count": 9},
+            "achievements": [{"id": "first_manifestation"}],
+            "custom_affirmations": [],
+        }
+        state = AchievementEngine.state_from_user(user)
+        unlocked = AchievementEngine.apply(state, "generate", 100.0, "2024-01-03")
+        unlocked += AchievementEngine.apply(state, "session")
+        self.log_test("Seeded From User Document", ids(unlocked) == ["manifested_1k", "streak_3", "sessions_10"],
+                      f"Unlocked: {ids(unlocked)}")
+
+        engine = AchievementEngine(max_users=2)
+        for user_id in ("a", "b", "a", "c"):
+            engine.get_state({"user_id": user_id})
+        self.log_test("State Cache Evicts Least Recent", list(engine.states) == ["a", "c"], f"Cached: {list(engine.states)}")
+
+    async def new_user(self, **stats):
+        user = server.new_user_document(f"{uuid.uuid4()}@example.com", "Achievement Test", "hash")
+        user["stats"].update(stats)
+        await self.storage.insert_user(user)
+        return user
+
+    async def add_notifications(self, user_id, offsets_and_amounts):
+        for offset, amount in offsets_and_amounts:
+            await self.storage.insert_notification({
+                "user_id": user_id, "amount": amount, "sender": "Universe", "bank": "Chase Bank",
+                "manifestation_type": "⚡ Instant Transfer", "timestamp": START + timedelta(days=offset)
+            })
+
+    async def test_backfill(self):
+        # Days 0-2 make a streak of 3, then a gap, then days 5-6 start over
+        generator = await self.new_user(consecutive_days=0, last_usage_date=None)
+        await self.add_notifications(generator["user_id"], [(0, 10.0), (1, 500.0), (2, 600.0), (5, 1.0), (6, 1.0)])
+        # Sessions and affirmations only, never generated
+        author = await self.new_user(sessions_count=10)
+        affirmed_at = START + timedelta(days=3)
+        for _ in range(2):
+            await self.storage.add_affirmation(author["user_id"], {"text": "I am abundant", "code": "5207418", "created_at": affirmed_at})
+        # Notifications left behind by a deleted account
+        await self.add_notifications("00000000-deleted", [(0, 5000.0)])
+
+        result = await server.backfill_achievements(batch_size=2)
+        self.log_test("Backfill Totals", result == {"users_processed": 2, "events_replayed": 5, "achievements_unlocked": 5},
+                      f"Result: {result}")
+
+        loaded = await self.storage.get_user(generator["user_id"])
+        unlocked_at = {a["id"]: a["unlocked_at"] for a in loaded["achievements"]}
+        expected = {
+            "first_manifestation": START,
+            "streak_3": START + timedelta(days=2),
+            "manifested_1k": START + timedelta(days=2),
+        }
+        self.log_test("Unlocked At Replayed Time", unlocked_at == expected, f"Unlocked: {unlocked_at}")
+        stats = loaded["stats"]
+        self.log_test("Streak Persisted", stats["consecutive_days"] == 2 and stats["last_usage_date"] == "2024-01-07",
+                      f"Stats: {stats}")
+
+        loaded = await self.storage.get_user(author["user_id"])
+        unlocked_at = {a["id"]: a["unlocked_at"] for a in loaded["achievements"]}
+        self.log_test("User Without Notifications", set(unlocked_at) == {"sessions_10", "first_affirmation"}
+                      and unlocked_at["first_affirmation"] == affirmed_at and loaded["stats"].get("last_usage_date") is None,
+                      f"Unlocked: {unlocked_at}")
+
+        again = await server.backfill_achievements(generator["user_id"])
+        loaded = await self.storage.get_user(generator["user_id"])
+        self.log_test("Backfill Idempotent", again["achievements_unlocked"] == 0 and again["events_replayed"] == 5
+                      and len(loaded["achievements"]) == 3, f"Result: {again}")
+
+    async def run(self):
+        self.test_streaks()
+        self.test_thresholds()
+        self.test_seeding()
+
+        await self.storage.connect()
+        server.storage = self.storage
+        try:
+            await self.storage.ensure_indexes()
+            await self.test_backfill()
+        finally:
+            await self.storage.close()
+
+        print(f"\n📊 Test Results: {self.tests_passed}/{self.tests_run} tests passed")
+        return self.tests_passed == self.tests_run
+
+
+def main():
+    """Main test execution"""
+    print("🚀 Starting DigiManifest Achievement Tests")
+    print("=" * 50)
+    with tempfile.TemporaryDirectory() as directory:
+        storage = SQLiteStorage(os.path.join(directory, "achievements_test.db"))
+        success = asyncio.run(AchievementTester(storage).run())
+    return 0 if success else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+DigiManifest compression and static caching test suite
+Serves a temporary frontend build through the real app with TestClient
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+
+# The frontend mount is created when server is imported, so the build has to exist first
+BUILD_DIR = tempfile.mkdtemp(prefix="digimanifest-build-")
+os.environ["FRONTEND_BUILD_DIR"] = BUILD_DIR
+
+from fastapi.testclient import TestClient
+from starlette.datastructures import Headers
+
+import server
+from precompress_static import precompress, write_if_smaller
+from storage import SQLiteStorage
+
+INDEX_HTML = "<html><body>" + "<p>Manifest abundance</p>" * 400 + "</body></html>"
+APP_JS = "var abundance = 1;\n" * 2000
+PLAIN_TXT = "Compressed on the fly. " * 400
+NOT_FOUND_HTML = "<html><body>" + "<p>Nothing here</p>" * 400 + "</body></html>"
+
+
+def write_build():
+    os.makedirs(os.path.join(BUILD_DIR, "static", "js"))
+    files = {
+        "index.html": INDEX_HTML,
+        os.path.join("static", "js", "app.js"): APP_JS,
+        "plain.txt": PLAIN_TXT,
+        "404.html": NOT_FOUND_HTML,
+    }
+    for name, content in files.items():
+        with open(os.path.join(BUILD_DIR, name), "w") as f:
+            f.write(content)
+    precompress(os.path.join(BUILD_DIR, "index.html"), 1024)
+    precompress(os.path.join(BUILD_DIR, "static", "js", "app.js"), 1024)
+
+
+def file_size(name):
+    return os.path.getsize(os.path.join(BUILD_DIR, name))
+
+
+class CompressionTester:
+    def __init__(self, client):
+        self.client = client
+        self.tests_run = 0
+        self.tests_passed = 0
+
+    def log_test(self, name, success, details=""):
+        """Log test results"""
+        self.tests_run += 1
+        if success:
+            self.tests_passed += 1
+            print(f"✅ {name} - PASSED {details}")
+        else:
+            print(f"❌ {name} - FAILED {details}")
+        return success
+
+    def get(self, path, accept_encoding="identity", **headers):
+        return self.client.get(path, headers={"Accept-Encoding": accept_encoding, **headers})
+
+    def test_negotiation(self):
+        cases = [
+            ("gzip, br", "br"),
+            ("br;q=0.1, gzip", "gzip"),
+            ("gzip;q=0.5, br;q=0.5", "br"),
+            ("br;q=0, gzip", "gzip"),
+            ("gzip;q=0", None),
+            ("*;q=0.5, br;q=0", "gzip"),
+            ("identity", None),
+            ("", None),
+        ]
+        for accept_encoding, expected in cases:
+            chosen = server.choose_encoding(Headers({"accept-encoding": accept_encoding}))
+            self.log_test(f"Negotiate '{accept_encoding}'", chosen == expected, f"Chosen: {chosen}")
+
+    def test_on_the_fly(self):
+        for accept_encoding, expected in (("br", "br"), ("gzip, br;q=0", "gzip"), ("identity", None)):
+            response = self.get("/plain.txt", accept_encoding)
+            self.log_test(f"Compress On The Fly ({accept_encoding})", response.status_code == 200
+                          and response.headers.get("content-encoding") == expected and response.text == PLAIN_TXT
+                          and "accept-encoding" in response.headers.get("vary", "").lower(),
+                          f"Encoding: {response.headers.get('content-encoding')}")
+
+        response = self.get("/openapi.json", "gzip")
+        self.log_test("JSON Compressed", response.headers.get("content-encoding") == "gzip" and response.json()["info"]["title"])
+
+    def test_precompressed(self):
+        for accept_encoding, suffix in (("br", ".br"), ("gzip", ".gz")):
+            response = self.get("/", accept_encoding)
+            # The sibling is sent as is; a recompressed body would differ in length
+            self.log_test(f"Precompressed {suffix} Passed Through", response.status_code == 200
+                          and response.headers.get("content-encoding") == accept_encoding
+                          and int(response.headers["content-length"]) == file_size("index.html" + suffix)
+                          and response.headers["content-type"].startswith("text/html") and response.text == INDEX_HTML,
+                          f"Length: {response.headers.get('content-length')}")
+
+        response = self.get("/index.html")
+        self.log_test("Identity Without Accept-Encoding", response.headers.get("content-encoding") is None
+                      and int(response.headers["content-length"]) == file_size("index.html"))
+
+    def test_cache_control(self):
+        response = self.get("/static/js/app.js", "gzip")
+        self.log_test("Hashed Assets Immutable", response.headers.get("cache-control") == "public, max-age=31536000, immutable"
+                      and response.headers.get("content-encoding") == "gzip", f"Cache-Control: {response.headers.get('cache-control')}")
+
+        for path in ("/", "/index.html", "/plain.txt"):
+            response = self.get(path, "br")
+            self.log_test(f"No-cache For {path}", response.headers.get("cache-control") == "no-cache",
+                          f"Cache-Control: {response.headers.get('cache-control')}")
+
+    def test_revalidation(self):
+        response = self.get("/plain.txt", "gzip")
+        etag = response.headers.get("etag", "")
+        revalidated = self.get("/plain.txt", "gzip", **{"If-None-Match": etag})
+        self.log_test("Weak ETag On Compressed File", etag.startswith('W/"'), f"ETag: {etag}")
+        self.log_test("Weak ETag Revalidates", revalidated.status_code == 304 and revalidated.content == b"",
+                      f"Status: {revalidated.status_code}")
+
+        listed = self.get("/plain.txt", "gzip", **{"If-None-Match": f'"stale", {etag}'})
+        changed = self.get("/plain.txt", "gzip", **{"If-None-Match": 'W/"stale"'})
+        self.log_test("ETag Lists And Mismatches", listed.status_code == 304 and changed.status_code == 200,
+                      f"Statuses: {listed.status_code}, {changed.status_code}")
+
+    def test_left_alone(self):
+        response = self.client.head("/plain.txt", headers={"Accept-Encoding": "gzip"})
+        self.log_test("HEAD Not Compressed", response.status_code == 200 and response.headers.get("content-encoding") is None
+                      and int(response.headers["content-length"]) == len(PLAIN_TXT), f"Headers: {dict(response.headers)}")
+
+        response = self.get("/missing-page.txt", "gzip")
+        self.log_test("Non-200 Not Compressed", response.status_code == 404 and response.headers.get("content-encoding") is None
+                      and response.text == NOT_FOUND_HTML, f"Status: {response.status_code}")
+
+    def test_stale_variants(self):
+        directory = tempfile.mkdtemp(prefix="digimanifest-precompress-")
+        try:
+            path = os.path.join(directory, "page.html")
+            with open(path, "w") as f:
+                f.write(INDEX_HTML)
+            written = precompress(path, 1024)
+            with open(path, "w") as f:
+                f.write("<p>tiny</p>")
+            precompress(path, 1024)
+            self.log_test("Variants Removed Below Minimum Size", set(written) >= {"gz"}
+                          and not os.path.exists(path + ".gz") and not os.path.exists(path + ".br"), f"Written: {written}")
+
+            with open(path + ".gz", "wb") as f:
+                f.write(b"stale")
+            kept = write_if_smaller(path + ".gz", b"x" * 100, 50)
+            self.log_test("Stale Variant Removed When Not Smaller", not kept and not os.path.exists(path + ".gz"))
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    def run(self):
+        self.test_negotiation()
+        self.test_on_the_fly()
+        self.test_precompressed()
+        self.test_cache_control()
+        self.test_revalidation()
+        self.test_left_alone()
+        self.test_stale_variants()
+        print(f"\n📊 Test Results: {self.tests_passed}/{self.tests_run} tests passed")
+        return self.tests_passed == self.tests_run
+
+
+def main():
+    """Main test execution"""
+    print("🚀 Starting DigiManifest Compression Tests")
+    print("=" * 50)
+    if server.get_brotli() is None:
+        print("❌ brotli is not installed - install backend/requirements.txt first")
+        return 1
+    try:
+        write_build()
+        server.create_storage = lambda: SQLiteStorage(os.path.join(BUILD_DIR, "compression_test.db"))
+        with TestClient(server.app) as client:
+            success = CompressionTester(client).run()
+    finally:
+        shutil.rmtree(BUILD_DIR, ignore_errors=True)
+    return 0 if success else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+DigiManifest bulk user import test suite
+Checks the per-row report of /api/admin/users/import against the SQLite backend
+"""
+
+import os
+import sys
+import tempfile
+import uuid
+
+from fastapi.testclient import TestClient
+
+import server
+from storage import SQLiteStorage
+
+ADMIN_KEY = "import-test-key"
+
+
+class ImportTester:
+    def __init__(self, client):
+        self.client = client
+        self.tests_run = 0
+        self.tests_passed = 0
+
+    def log_test(self, name, success, details=""):
+        """Log test results"""
+        self.tests_run += 1
+        if success:
+            self.tests_passed += 1
+            print(f"✅ {name} - PASSED {details}")
+        else:
+            print(f"❌ {name} - FAILED {details}")
+        return success
+
+    def import_users(self, users, key=ADMIN_KEY):
+        return self.client.post("/api/admin/users/import", json={"users": users}, headers={"X-Admin-Key": key})
+
+    def test_admin_key(self):
+        for name, key in (("Wrong Admin Key", "wrong"), ("Empty Admin Key", "")):
+            response = self.import_users([], key=key)
+            self.log_test(name, response.status_code == 403, f"Status: {response.status_code}")
+
+        server.ADMIN_API_KEY = ""
+        try:
+            response = self.import_users([], key="")
+            self.log_test("Import Disabled Without Key", response.status_code == 403, f"Status: {response.status_code}")
+        finally:
+            server.ADMIN_API_KEY = ADMIN_KEY
+
+    def test_row_report(self):
+        tag = uuid.uuid4().hex[:8]
+        existing = f"existing-{tag}@example.com"
+        self.client.post("/api/auth/register", json={"email": existing, "name": "Existing", "password": "secret1"})
+        legacy_hash = server.get_bcrypt().hashpw(b"legacy-pass", server.get_bcrypt().gensalt(4)).decode()
+
+        rows = [
+            {"email": f"plain-{tag}@example.com", "name": "Plain", "password": "secret1"},
+            {"email": f"legacy-{tag}@example.com", "name": "Legacy", "password_hash": legacy_hash, "is_pro": True},
+            {"email": f"plain-{tag}@example.com", "name": "Twice", "password": "secret1"},
+            {"email": existing, "name": "Existing", "password": "secret1"},
+            {"email": "not-an-email", "name": "Invalid", "password": "secret1"},
+            {"email": f"nopass-{tag}@example.com", "name": "No Password"},
+            {"email": f"plaintext-{tag}@example.com", "name": "Plaintext", "password_hash": "legacy-pass"},
+            "notadict",
+        ]
+        response = self.import_users(rows)
+        if not self.log_test("Import Accepted", response.status_code == 200, f"Status: {response.status_code}"):
+            return
+        report = response.json()
+        errors = {error["row"]: error["error"] for error in report["errors"]}
+        self.log_test("Import Totals", report["total"] == 8 and report["imported"] == 2 and report["failed"] == 6, f"Report: {report}")
+        self.log_test("Duplicate In Batch", errors.get(2) == "Email already registered", f"Error: {errors.get(2)}")
+        self.log_test("Existing Email", errors.get(3) == "Email already registered", f"Error: {errors.get(3)}")
+        self.log_test("Invalid Email", 4 in errors, f"Error: {errors.get(4)}")
+        self.log_test("Missing Password", errors.get(5) == "password or password_hash is required", f"Error: {errors.get(5)}")
+        self.log_test("Non-bcrypt Hash", errors.get(6) == "password_hash is not a bcrypt hash", f"Error: {errors.get(6)}")
+        self.log_test("Non-object Row", errors.get(7) == "row must be an object", f"Error: {errors.get(7)}")
+        self.log_test("Errors Ordered By Row", [error["row"] for error in report["errors"]] == sorted(errors))
+
+        login = self.client.post("/api/auth/login", json={"email": f"legacy-{tag}@example.com", "password": "legacy-pass"})
+        user = login.json().get("user", {}) if login.status_code == 200 else {}
+        self.log_test("Imported Hash Logs In", login.status_code == 200 and user.get("is_pro") is True, f"Status: {login.status_code}")
+
+    def test_batches(self):
+        # Rows are reported with their position in the request, not in the batch
+        server.USER_IMPORT_BATCH_SIZE = 2
+        tag = uuid.uuid4().hex[:8]
+        rows = [{"email": f"batch-{tag}-{i}@example.com", "name": "Batch", "password": "secret1"} for i in range(5)]
+        rows[3] = dict(rows[0])
+        response = self.import_users(rows)
+        report = response.json()
+        self.log_test("Rows Numbered Across Batches", report["imported"] == 4
+                      and [error["row"] for error in report["errors"]] == [3], f"Report: {report}")
+
+    def run(self):
+        self.test_admin_key()
+        self.test_row_report()
+        self.test_batches()
+        print(f"\n📊 Test Results: {self.tests_passed}/{self.tests_run} tests passed")
+        return self.tests_passed == self.tests_run
+
+
+def main():
+    """Main test execution"""
+    print("🚀 Starting DigiManifest User Import Tests")
+    print("=" * 50)
+    with tempfile.TemporaryDirectory() as directory:
+        server.ADMIN_API_KEY = ADMIN_KEY
+        server.create_storage = lambda: SQLiteStorage(os.path.join(directory, "import_test.db"))
+        with TestClient(server.app) as client:
+            success = ImportTester(client).run()
+    return 0 if success else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+DigiManifest static asset precompression
+Writes .gz (and .br when the brotli package is installed) next to every
+compressible file, so the server can send them without compressing per request
+"""
+
+import argparse
+import gzip
+import os
+import sys
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Only what the backend serves through PrecompressedStaticFiles
+DEFAULT_TARGETS = [
+    os.path.join(REPO_DIR, "frontend", "build"),
+]
+COMPRESSIBLE_EXTENSIONS = (".html", ".css", ".js", ".json", ".svg", ".txt", ".map", ".xml", ".ico")
+
+
+def iter_files(targets):
+    for target in targets:
+        if os.path.isfile(target):
+            yield target
+        elif os.path.isdir(target):
+            for root, _, files in os.walk(target):
+                for name in sorted(files):
+                    yield os.path.join(root, name)
+
+
+def remove_stale(path):
+    # A variant left over from an earlier build would be served for the new file
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def write_if_smaller(path, data, original_size):
+    if len(data) >= original_size:
+        remove_stale(path)
+        return False
+    with open(path, "wb") as f:
+        f.write(data)
+    return True
+
+
+def precompress(path, minimum_size):
+    """Compress one file, returning the sizes of the variants written"""
+    if not path.endswith(COMPRESSIBLE_EXTENSIONS):
+        return {}
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) < minimum_size:
+        for suffix in (".gz", ".br"):
+            remove_stale(path + suffix)
+        return {}
+
+    written = {}
+    # mtime=0 keeps the output byte-for-byte reproducible between builds
+    gzipped = gzip.compress(data, compresslevel=9, mtime=0)
+    if write_if_smaller(path + ".gz", gzipped, len(data)):
+        written["gz"] = len(gzipped)
+    if brotli is not None:
+        compressed = brotli.compress(data, quality=11)
+        if write_if_smaller(path + ".br", compressed, len(data)):
+            written["br"] = len(compressed)
+    else:
+        remove_stale(path + ".br")
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("targets", nargs="*", default=DEFAULT_TARGETS, help="files or directories to precompress")
+    parser.add_argument("--min-size", type=int, default=1024, help="skip files smaller than this many bytes")
+    args = parser.parse_args()
+
+    if brotli is None:
+        print("⚠️  brotli not installed - writing gzip variants only")
+
+    for path in iter_files(args.targets):
+        written = precompress(path, args.min_size)
+        if written:
+            sizes = ", ".join(f"{encoding}: {size / 1024:.1f} KB" for encoding, size in written.items())
+            print(f"✅ {os.path.relpath(path, REPO_DIR)} ({os.path.getsize(path) / 1024:.1f} KB) -> {sizes}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
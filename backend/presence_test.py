@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+DigiManifest presence tracking test suite
+Checks HyperLogLog accuracy and merging, window and bucket boundaries and pruning
+"""
+
+import sys
+
+from server import HLL_REGISTERS, PresenceTracker, hll_add, hll_count, hll_merge
+
+# Aligned to every bucket width, so bucket starts are easy to reason about
+T = 472222 * 3600
+# Three standard errors of a 2^10 register sketch (1.04 / sqrt(m))
+TOLERANCE = 3 * 1.04 / HLL_REGISTERS ** 0.5
+
+
+class PresenceTester:
+    def __init__(self):
+        self.tests_run = 0
+        self.tests_passed = 0
+
+    def log_test(self, name, success, details=""):
+        """Log test results"""
+        self.tests_run += 1
+        if success:
+            self.tests_passed += 1
+            print(f"✅ {name} - PASSED {details}")
+        else:
+            print(f"❌ {name} - FAILED {details}")
+        return success
+
+    @staticmethod
+    def sketch(user_ids):
+        registers = bytearray(HLL_REGISTERS)
+        for user_id in user_ids:
+            hll_add(registers, user_id)
+        return registers
+
+    def test_accuracy(self):
+        for n in (1, 10, 100, 1000, 10000, 100000):
+            estimate = hll_count(self.sketch(f"user-{i}" for i in range(n)))
+            self.log_test(f"Estimate {n} Users", abs(estimate - n) <= max(1, n * TOLERANCE), f"Estimate: {estimate}")
+
+        registers = self.sketch(["same-user"] * 1000)
+        self.log_test("Repeated User Counted Once", hll_count(registers) == 1)
+        self.log_test("Empty Sketch", hll_count(bytearray(HLL_REGISTERS)) == 0)
+
+    def test_merge(self):
+        first = self.sketch(f"user-{i}" for i in range(6000))
+        second = self.sketch(f"user-{i}" for i in range(3000, 9000))
+        union = self.sketch(f"user-{i}" for i in range(9000))
+
+        merged = bytearray(first)
+        hll_merge(merged, second)
+        estimate = hll_count(merged)
+        self.log_test("Merge Is Union", merged == union and abs(estimate - 9000) <= 9000 * TOLERANCE, f"Estimate: {estimate}")
+
+        reversed_merge = bytearray(second)
+        hll_merge(reversed_merge, first)
+        again = bytearray(merged)
+        hll_merge(again, first)
+        self.log_test("Merge Commutative And Idempotent", reversed_merge == merged and again == merged)
+
+    def test_bucket_boundaries(self):
+        tracker = PresenceTracker("test-worker")
+        tracker.record("early", now=T + 9.9)
+        tracker.record("late", now=T + 10)
+        self.log_test("Bucket Start Boundary", sorted(tracker.buckets[10]) == [T, T + 10]
+                      and sorted(tracker.buckets[60]) == [T], f"Buckets: {sorted(tracker.buckets[10])}")
+
+    def test_window_boundaries(self):
+        tracker = PresenceTracker("test-worker")
+        tracker.record("user", now=T)
+        checks = [
+            # A bucket stays in a window while any part of it overlaps the window
+            ("1m", T + 69, 1), ("1m", T + 70, 0),
+            ("5m", T + 309, 1), ("5m", T + 310, 0),
+            ("1h", T + 3659, 1), ("1h", T + 3660, 0),
+        ]
+        for window, now, expected in checks:
+            counts = tracker.compute_counts(tracker.buckets, now)
+            self.log_test(f"Window {window} At +{now - T}s", counts[window] == expected, f"Counts: {counts}")
+
+    def test_prune(self):
+        tracker = PresenceTracker("test-worker")
+        tracker.record("user", now=T)
+        tracker.prune(T + 310)
+        kept = T in tracker.buckets[10]
+        tracker.prune(T + 311)
+        self.log_test("Prune 10s Buckets After Retention", kept and T not in tracker.buckets[10] and T in tracker.buckets[60])
+
+        tracker.prune(T + 3660)
+        kept = T in tracker.buckets[60]
+        tracker.prune(T + 3661)
+        self.log_test("Prune 60s Buckets After Retention", kept and T not in tracker.buckets[60])
+
+    def test_workers(self):
+        # Two workers seeing overlapping users report the union once merged
+        first, second = PresenceTracker("worker-1"), PresenceTracker("worker-2")
+        for i in range(500):
+            first.record(f"user-{i}", now=T + i % 60)
+        for i in range(250, 750):
+            second.record(f"user-{i}", now=T + i % 60)
+
+        merged = {}
+        PresenceTracker.merge_states(merged, first.export_state())
+        PresenceTracker.merge_states(merged, second.export_state())
+        counts = first.compute_counts(merged, T + 60)
+        self.log_test("Workers Merge To Union", all(abs(count - 750) <= 750 * TOLERANCE for count in counts.values()),
+                      f"Counts: {counts}")
+
+    def run(self):
+        self.test_accuracy()
+        self.test_merge()
+        self.test_bucket_boundaries()
+        self.test_window_boundaries()
+        self.test_prune()
+        self.test_workers()
+
+        print(f"\n📊 Test Results: {self.tests_passed}/{self.tests_run} tests passed")
+        return self.tests_passed == self.tests_run
+
+
+def main():
+    """Main test execution"""
+    print("🚀 Starting DigiManifest Presence Tests")
+    print("=" * 50)
+    return 0 if PresenceTester().run() else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+DigiManifest read routing test harness
+Starts a local 3-member replica set and checks which member serves each read route
+Requires the mongod binary on PATH
+"""
+
+import asyncio
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from pymongo import MongoClient, monitoring
+
+import server
+from storage import MotorStorage
+
+REPLICA_SET = "rs-digimanifest-test"
+BASE_PORT = int(os.environ.get("REPLICA_SET_BASE_PORT", "27217"))
+MEMBERS = 3
+
+
+class ReadRecorder(monitoring.CommandListener):
+    """Remember which server handled each read command"""
+
+    def __init__(self):
+        self.reads = []
+
+    def started(self, event):
+        if event.command_name in ("find", "aggregate", "count"):
+            self.reads.append((event.command_name, event.connection_id))
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+class LocalReplicaSet:
+    def __init__(self, members=MEMBERS, base_port=BASE_PORT):
+        self.ports = [base_port + i for i in range(members)]
+        self.data_dir = tempfile.mkdtemp(prefix="digimanifest-rs-")
+        self.processes = []
+
+    @property
+    def url(self):
+        hosts = ",".join(f"localhost:{port}" for port in self.ports)
+        return f"mongodb://{hosts}/?replicaSet={REPLICA_SET}"
+
+    def start(self):
+        for port in self.ports:
+            db_path = os.path.join(self.data_dir, str(port))
+            os.makedirs(db_path)
+            self.processes.append(subprocess.Popen(
+                ["mongod", "--replSet", REPLICA_SET, "--port", str(port), "--bind_ip", "localhost",
+                 "--dbpath", db_path, "--quiet", "--logpath", os.path.join(db_path, "mongod.log")],
+                stdout=subprocess.DEVNULL,
+            ))
+
+        admin = MongoClient(f"mongodb://localhost:{self.ports[0]}/?directConnection=true", serverSelectionTimeoutMS=30000)
+        admin.admin.command("replSetInitiate", {
+            "_id": REPLICA_SET,
+            "members": [
+                # Only the first member may become primary so the test is deterministic
+                {"_id": i, "host": f"localhost:{port}", "priority": 1 if i == 0 else 0}
+                for i, port in enumerate(self.ports)
+            ],
+        })
+
+        deadline = time.time() + 60
+        while time.time() < deadline:
+            status = admin.admin.command("replSetGetStatus")
+            states = [member["stateStr"] for member in status["members"]]
+            if states.count("PRIMARY") == 1 and states.count("SECONDARY") == len(self.ports) - 1:
+                admin.close()
+                return
+            time.sleep(0.5)
+        admin.close()
+        raise RuntimeError("Replica set did not become healthy in time")
+
+    def stop(self):
+        for process in self.processes:
+            process.terminate()
+        for process in self.processes:
+            process.wait(timeout=30)
+        shutil.rmtree(self.data_dir, ignore_errors=True)
+
+
+class ReadRoutingTester:
+    def __init__(self, url):
+        self.url = url
+        self.tests_run = 0
+        self.tests_passed = 0
+
+    def log_test(self, name, success, details=""):
+        """Log test results"""
+        self.tests_run += 1
+        if success:
+            self.tests_passed += 1
+            print(f"✅ {name} - PASSED {details}")
+        else:
+            print(f"❌ {name} - FAILED {details}")
+        return success
+
+    async def run(self):
+        recorder = ReadRecorder()
+        storage = MotorStorage(
+            self.url,
+            db_name="digimanifest_read_routing_test",
+            read_routes={"public": server.PUBLIC_READ_PREFERENCE, "analytics": server.ANALYTICS_READ_PREFERENCE},
+            max_staleness=server.READ_MAX_STALENESS_SECONDS,
+            event_listeners=[recorder],
+            w=MEMBERS,
+        )
+        await storage.connect()
+        server.storage = storage
+
+        try:
+            # Writes always go to the primary; w=MEMBERS makes them visible on secondaries
+            await storage.insert_user({"user_id": "rs-user", "email": "rs@example.com"})
+            await storage.insert_notification({"user_id": "rs-user", "amount": 42.0})
+            hello = await storage.client.admin.command("hello")
+            primary = hello["primary"]
+
+            async def replay_notifications():
+                return [n async for n in storage.iter_notifications("rs-user")]
+
+            async def replay_users():
+                return [u async for u in storage.iter_users()]
+
+            checks = [
+                ("Primary Route", lambda: storage.get_user("rs-user"), True),
+                ("Analytics Route", storage.total_manifested, False),
+                ("Public Route", lambda: storage.recent_stories(10), False),
+                # The achievement backfill replays users and notifications from secondaries
+                ("Notification Replay Route", replay_notifications, False),
+                ("User Replay Route", replay_users, False),
+                ("Community Stats Route", server.get_community_stats, False),
+            ]
+
+            for name, query, expect_primary in checks:
+                recorder.reads.clear()
+                await query()
+                hosts = {f"{host}:{port}" for _, (host, port) in recorder.reads}
+                routed = hosts == {primary} if expect_primary else primary not in hosts
+                self.log_test(name, bool(hosts) and routed, f"Served by: {', '.join(sorted(hosts))}")
+        finally:
+            await storage.client.drop_database("digimanifest_read_routing_test")
+            await storage.close()
+
+        print(f"\n📊 Test Results: {self.tests_passed}/{self.tests_run} tests passed")
+        return self.tests_passed == self.tests_run
+
+
+def main():
+    """Main test execution"""
+    if shutil.which("mongod") is None:
+        print("❌ mongod not found on PATH - cannot start a local replica set")
+        return 1
+
+    print("🚀 Starting local replica set for read routing tests")
+    replica_set = LocalReplicaSet()
+    try:
+        replica_set.start()
+        success = asyncio.run(ReadRoutingTester(replica_set.url).run())
+    finally:
+        replica_set.stop()
+    return 0 if success else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
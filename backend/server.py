@@ -1,48 +1,327 @@
-from fastapi import FastAPI, HTTPException, Depends, status, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Depends, status, BackgroundTasks, Header
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers, MutableHeaders
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, ValidationError, Field
 from typing import Optional, List, Dict, Any
-from datetime import datetime, timedelta
-from motor.motor_asyncio import AsyncIOMotorClient
+from datetime import datetime, timedelta, date
+from storage import StorageBackend, MotorStorage, SQLiteStorage, DuplicateKeyError
 import os
 import jwt
-import bcrypt
 import uuid
+import math
+import time
+import hashlib
+import hmac
+import re
 import asyncio
 from contextlib import asynccontextmanager
-import stripe
+from functools import lru_cache
 import random
+import importlib
+import zlib
+import mimetypes
+import stat
+import sys
+from collections import OrderedDict
 
 # Environment variables
+STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND', 'mongo')  # 'mongo' or 'sqlite'
 MONGO_URL = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+SQLITE_PATH = os.environ.get('SQLITE_PATH', 'digimanifest.db')
+SQLITE_COMMIT_INTERVAL = float(os.environ.get('SQLITE_COMMIT_INTERVAL', '0.05'))
+SQLITE_COMMIT_BATCH_SIZE = int(os.environ.get('SQLITE_COMMIT_BATCH_SIZE', '500'))
 JWT_SECRET = os.environ.get('JWT_SECRET', 'your-secret-key-here')
 STRIPE_SECRET_KEY = os.environ.get('STRIPE_SECRET_KEY', '')
 STRIPE_WEBHOOK_SECRET = os.environ.get('STRIPE_WEBHOOK_SECRET', '')
+ADMIN_API_KEY = os.environ.get('ADMIN_API_KEY', '')
+USER_IMPORT_BATCH_SIZE = int(os.environ.get('USER_IMPORT_BATCH_SIZE', '1000'))
+ACHIEVEMENT_STATE_CACHE_SIZE = int(os.environ.get('ACHIEVEMENT_STATE_CACHE_SIZE', '50000'))
+STATS_FLUSH_INTERVAL = float(os.environ.get('STATS_FLUSH_INTERVAL', '5'))
+PRESENCE_REFRESH_INTERVAL = float(os.environ.get('PRESENCE_REFRESH_INTERVAL', '10'))
+STORY_QUEUE_SIZE = int(os.environ.get('STORY_QUEUE_SIZE', '10000'))
+STORY_WORKERS = int(os.environ.get('STORY_WORKERS', '2'))
+STORY_PUBLISH_BATCH_SIZE = int(os.environ.get('STORY_PUBLISH_BATCH_SIZE', '50'))
+STORY_PUBLISH_INTERVAL = float(os.environ.get('STORY_PUBLISH_INTERVAL', '2'))
+STORY_FEED_TTL = float(os.environ.get('STORY_FEED_TTL', '60'))
+WORKER_ID = os.environ.get('WORKER_ID', f"{os.uname().nodename}-{os.getpid()}")
+ANALYTICS_READ_PREFERENCE = os.environ.get('ANALYTICS_READ_PREFERENCE', 'secondaryPreferred')
+PUBLIC_READ_PREFERENCE = os.environ.get('PUBLIC_READ_PREFERENCE', 'secondaryPreferred')
+READ_MAX_STALENESS_SECONDS = int(os.environ.get('READ_MAX_STALENESS_SECONDS', '120'))
+INDEX_RETRY_INTERVAL = float(os.environ.get('INDEX_RETRY_INTERVAL', '5'))
+READINESS_PING_TIMEOUT = float(os.environ.get('READINESS_PING_TIMEOUT', '2'))
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', '1024'))
+FRONTEND_BUILD_DIR = os.environ.get('FRONTEND_BUILD_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'frontend', 'build'))
 
-# Configure Stripe
-stripe.api_key = STRIPE_SECRET_KEY
+# Rarely used heavy dependencies are imported on first use to keep cold start fast
+@lru_cache(maxsize=None)
+def get_stripe():
+    stripe = importlib.import_module("stripe")
+    stripe.api_key = STRIPE_SECRET_KEY
+    return stripe
 
-# Database client
-mongodb_client = None
-database = None
+@lru_cache(maxsize=None)
+def get_bcrypt():
+    return importlib.import_module("bcrypt")
+
+# Brotli is optional; without it responses fall back to gzip
+@lru_cache(maxsize=None)
+def get_brotli():
+    try:
+        return importlib.import_module("brotli")
+    except ImportError:
+        return None
+
+# Storage backend
+storage: Optional[StorageBackend] = None
+indexes_ready = False
+
+def create_storage() -> StorageBackend:
+    if STORAGE_BACKEND == "sqlite":
+        return SQLiteStorage(SQLITE_PATH, commit_interval=SQLITE_COMMIT_INTERVAL, commit_batch_size=SQLITE_COMMIT_BATCH_SIZE)
+    if STORAGE_BACKEND == "mongo":
+        # Public and analytics reads may go to secondaries; everything else uses the primary
+        return MotorStorage(
+            MONGO_URL,
+            read_routes={"public": PUBLIC_READ_PREFERENCE, "analytics": ANALYTICS_READ_PREFERENCE},
+            max_staleness=READ_MAX_STALENESS_SECONDS
+        )
+    raise ValueError(f"Unknown storage backend: {STORAGE_BACKEND}")
+
+async def ensure_indexes():
+    global indexes_ready
+    while True:
+        try:
+            await storage.ensure_indexes()
+            indexes_ready = True
+            return
+        except Exception as e:
+            print(f"Index creation failed, will retry: {e}")
+            await asyncio.sleep(INDEX_RETRY_INTERVAL)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    global mongodb_client, database
-    mongodb_client = AsyncIOMotorClient(MONGO_URL)
-    database = mongodb_client.digimanifest
+    global storage
+    storage = create_storage()
+    await storage.connect()
     
-    # Create indexes
-    await database.users.create_index("email", unique=True)
-    await database.users.create_index("user_id", unique=True)
+    # Create indexes in the background so serving is not blocked on them
+    index_task = asyncio.create_task(ensure_indexes())
+    
+    # Background flushing of buffered stats and presence refresh
+    stats_flush_task = asyncio.create_task(stats_buffer.run(STATS_FLUSH_INTERVAL))
+    presence_task = asyncio.create_task(presence_tracker.run(PRESENCE_REFRESH_INTERVAL))
+    story_queue.start(STORY_WORKERS)
     
     yield
     
     # Shutdown
-    if mongodb_client:
-        mongodb_client.close()
+    for task in (index_task, presence_task, stats_flush_task):
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    # Each step runs even if an earlier one fails
+    try:
+        await stats_buffer.flush()
+    finally:
+        try:
+            await story_queue.stop()
+        finally:
+            await storage.close()
+
+# HTTP compression and caching
+COMPRESSIBLE_TYPES = (
+    "text/", "application/json", "application/javascript", "application/xml",
+    "image/svg+xml", "application/manifest+json"
+)
+
+def accepted_encodings(headers: Headers) -> Dict[str, float]:
+    encodings = {}
+    for part in headers.get("accept-encoding", "").split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            encodings[name.lower()] = quality
+    return encodings
+
+def choose_encoding(headers: Headers, available=("br", "gzip")) -> Optional[str]:
+    # Highest q-value wins; ties go to the earlier entry in available
+    encodings = accepted_encodings(headers)
+    best, best_quality = None, 0.0
+    for encoding in available:
+        if encoding == "br" and get_brotli() is None:
+            continue
+        quality = encodings.get(encoding, encodings.get("*", 0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+def add_vary_accept_encoding(headers: MutableHeaders):
+    vary = [value.strip().lower() for value in headers.get("vary", "").split(",")]
+    if "accept-encoding" not in vary:
+        headers.add_vary_header("Accept-Encoding")
+
+def opaque_etag(tag: str) -> str:
+    tag = tag.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    return tag.strip('"')
+
+class StreamCompressor:
+    def __init__(self, encoding: str):
+        if encoding == "br":
+            brotli = get_brotli()
+            self.compressor = brotli.Compressor(quality=5)
+            self.compress = self.compressor.process
+            self.flush = self.compressor.finish
+        else:
+            self.compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # gzip container
+            self.compress = self.compressor.compress
+            self.flush = self.compressor.flush
+
+class CompressionMiddleware:
+    # Compresses 200 responses above minimum_size with Brotli or gzip. Responses
+    # that already carry a Content-Encoding (precompressed static files) pass through,
+    # as do HEAD requests, whose headers would otherwise describe a body never sent.
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope))
+        start_message = None
+        compressor = None
+
+        async def send_compressed(message):
+            nonlocal start_message, compressor
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            if start_message is not None:
+                headers = MutableHeaders(raw=start_message["headers"])
+                body = message.get("body", b"")
+                more_body = message.get("more_body", False)
+                compressible = headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+                if compressible:
+                    add_vary_accept_encoding(headers)
+                length = int(headers["content-length"]) if "content-length" in headers else None
+
+                if (
+                    encoding is None
+                    or start_message["status"] != 200
+                    or not compressible
+                    or "content-encoding" in headers
+                    or (length if length is not None else len(body)) < self.minimum_size
+                ):
+                    await send(start_message)
+                    start_message = None
+                    await send(message)
+                    return
+
+                compressor = StreamCompressor(encoding)
+                headers["content-encoding"] = encoding
+                del headers["content-length"]
+                if not more_body:
+                    body = compressor.compress(body) + compressor.flush()
+                    headers["content-length"] = str(len(body))
+                else:
+                    body = compressor.compress(body)
+                # The compressed bytes differ from the identity body the ETag was computed over
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    headers["etag"] = 'W/"' + etag.strip('"') + '"'
+                await send(start_message)
+                start_message = None
+                await send({"type": "http.response.body", "body": body, "more_body": more_body})
+                return
+
+            if compressor is None:
+                await send(message)
+                return
+            body = compressor.compress(message.get("body", b""))
+            if not message.get("more_body", False):
+                body += compressor.flush()
+            await send({"type": "http.response.body", "body": body, "more_body": message.get("more_body", False)})
+
+        await self.app(scope, receive, send_compressed)
+
+class ETagMiddleware:
+    # Adds weak ETags to JSON API responses and answers If-None-Match with 304,
+    # so polling clients only download a body when it changed.
+    def __init__(self, app, path_prefix: str = "/api/"):
+        self.app = app
+        self.path_prefix = path_prefix
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD") or not scope["path"].startswith(self.path_prefix):
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        cache_control = "private, no-cache" if "authorization" in request_headers else "no-cache"
+        start_message = None
+        passthrough = False
+
+        async def send_with_etag(message):
+            nonlocal start_message, passthrough
+            if passthrough or message["type"] not in ("http.response.start", "http.response.body"):
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if message["status"] != 200 or not headers.get("content-type", "").startswith("application/json"):
+                    passthrough = True
+                    await send(message)
+                else:
+                    start_message = message
+                return
+
+            if message.get("more_body", False):
+                # Streaming JSON is left alone
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            etag = f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+            headers = MutableHeaders(raw=start_message["headers"])
+            headers["etag"] = etag
+            headers["cache-control"] = cache_control
+
+            if_none_match = request_headers.get("if-none-match", "")
+            candidates = [tag.strip() for tag in if_none_match.split(",")]
+            if etag in candidates or f'"{etag[3:-1]}"' in candidates or "*" in candidates:
+                not_modified = MutableHeaders(raw=[
+                    (key, value) for key, value in start_message["headers"]
+                    if key.lower() not in (b"content-length", b"content-type")
+                ])
+                await send({"type": "http.response.start", "status": 304, "headers": not_modified.raw})
+                await send({"type": "http.response.body", "body": b""})
+                return
+
+            await send(start_message)
+            await send(message)
+
+        await self.app(scope, receive, send_with_etag)
 
 # Initialize FastAPI
 app = FastAPI(title="DigiManifest API", lifespan=lifespan)
@@ -56,6 +335,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compression wraps the ETag layer so ETags are computed over the identity body
+app.add_middleware(ETagMiddleware)
+app.add_middleware(CompressionMiddleware, minimum_size=COMPRESSION_MIN_SIZE)
+
 # Security
 security = HTTPBearer()
 
@@ -69,6 +352,19 @@ class UserLogin(BaseModel):
     email: EmailStr
     password: str
 
+class UserImportEntry(BaseModel):
+    email: EmailStr
+    name: str
+    password: Optional[str] = None
+    password_hash: Optional[str] = None  # existing bcrypt hash from the old platform
+    is_pro: bool = False
+    created_at: Optional[datetime] = None
+
+class UserImportRequest(BaseModel):
+    # Rows are validated one by one in prepare_import_row, so a bad row
+    # shows up in the report instead of rejecting the whole request
+    users: List[Any]
+
 class UserProfile(BaseModel):
     user_id: str
     email: str
@@ -113,13 +409,13 @@ class SocialProofEntry(BaseModel):
     amount: float
     code: str
     description: Optional[str] = None
-    created_at: datetime = datetime.utcnow()
-    user_id: str
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    user_id: Optional[str] = None
 
 class CustomAffirmation(BaseModel):
     text: str
     code: str
-    created_at: datetime = datetime.utcnow()
+    created_at: datetime = Field(default_factory=datetime.utcnow)
 
 class NotificationLog(BaseModel):
     user_id: str
@@ -128,14 +424,39 @@ class NotificationLog(BaseModel):
     bank: str
     manifestation_type: str
     grabovoi_code: Optional[str] = None
-    timestamp: datetime = datetime.utcnow()
+    timestamp: datetime = Field(default_factory=datetime.utcnow)
 
 # Utility Functions
 def hash_password(password: str) -> str:
+    bcrypt = get_bcrypt()
     return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
 
 def verify_password(password: str, hashed: str) -> bool:
-    return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+    return get_bcrypt().checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+
+# bcrypt is CPU bound and releases the GIL, so run it in the default executor
+async def hash_password_async(password: str) -> str:
+    return await asyncio.to_thread(hash_password, password)
+
+async def verify_password_async(password: str, hashed: str) -> bool:
+    return await asyncio.to_thread(verify_password, password, hashed)
+
+def new_user_document(email: str, name: str, hashed_password: str, is_pro: bool = False, created_at: Optional[datetime] = None) -> dict:
+    return {
+        "user_id": str(uuid.uuid4()),
+        "email": email,
+        "name": name,
+        "password": hashed_password,
+        "is_pro": is_pro,
+        "created_at": created_at or datetime.utcnow(),
+        "subscription_status": None,
+        "subscription_ends_at": None,
+        "settings": ManifestationSettings().dict(),
+        "stats": UserStats().dict(),
+        "achievements": [],
+        "custom_affirmations": [],
+        "social_proof_submissions": []
+    }
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -154,10 +475,11 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
         if user_id is None:
             raise HTTPException(status_code=401, detail="Invalid token")
         
-        user = await database.users.find_one({"user_id": user_id})
+        user = await storage.get_user(user_id)
         if user is None:
             raise HTTPException(status_code=401, detail="User not found")
         
+        presence_tracker.record(user_id)
         return user
     except jwt.PyJWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
@@ -195,40 +517,569 @@ MANIFESTATION_TYPES = [
     {"key": "bonus", "text": "🎁 Bonus Payment"}
 ]
 
+# Achievements
+ACHIEVEMENTS = [
+    {"id": "first_manifestation", "name": "First Spark", "description": "Generate your first manifestation", "icon": "✨", "rule": "total_manifested", "threshold": 0.01},
+    {"id": "manifested_1k", "name": "Four Figures", "description": "Manifest $1,000 in total", "icon": "💵", "rule": "total_manifested", "threshold": 1000},
+    {"id": "manifested_10k", "name": "Five Figures", "description": "Manifest $10,000 in total", "icon": "💰", "rule": "total_manifested", "threshold": 10000},
+    {"id": "manifested_100k", "name": "Six Figures", "description": "Manifest $100,000 in total", "icon": "🏦", "rule": "total_manifested", "threshold": 100000},
+    {"id": "streak_3", "name": "Momentum", "description": "Manifest 3 days in a row", "icon": "🔥", "rule": "streak", "threshold": 3},
+    {"id": "streak_7", "name": "Weekly Ritual", "description": "Manifest 7 days in a row", "icon": "📅", "rule": "streak", "threshold": 7},
+    {"id": "streak_21", "name": "21-Day Cycle", "description": "Manifest 21 days in a row", "icon": "🌕", "rule": "streak", "threshold": 21},
+    {"id": "sessions_10", "name": "Regular", "description": "Complete 10 manifestation sessions", "icon": "🧘", "rule": "sessions", "threshold": 10},
+    {"id": "sessions_100", "name": "Devoted", "description": "Complete 100 manifestation sessions", "icon": "🕉️", "rule": "sessions", "threshold": 100},
+    {"id": "first_affirmation", "name": "Own Words", "description": "Create your first custom affirmation", "icon": "📝", "rule": "affirmations", "threshold": 1},
+    {"id": "affirmations_10", "name": "Affirmation Author", "description": "Create 10 custom affirmations", "icon": "📖", "rule": "affirmations", "threshold": 10},
+]
+
+# Rules grouped per counter and sorted by threshold, so each user only ever
+# has to look at the next locked threshold of the counter an event touched
+ACHIEVEMENT_RULES = {}
+for _achievement in sorted(ACHIEVEMENTS, key=lambda a: a["threshold"]):
+    ACHIEVEMENT_RULES.setdefault(_achievement["rule"], []).append(_achievement)
+
+class AchievementEngine:
+    def __init__(self, max_users: int = ACHIEVEMENT_STATE_CACHE_SIZE):
+        self.max_users = max_users
+        self.states = OrderedDict()
+
+    @staticmethod
+    def new_state(unlocked=None) -> dict:
+        return {
+            "last_day": None,
+            "streak": 0,
+            "total_manifested": 0.0,
+            "sessions": 0,
+            "affirmations": 0,
+            "unlocked": set(unlocked or []),
+            "next_rule": {rule: 0 for rule in ACHIEVEMENT_RULES},
+        }
+
+    @classmethod
+    def state_from_user(cls, user: dict) -> dict:
+        stats = user.get("stats", {})
+        state = cls.new_state(a["id"] for a in user.get("achievements", []))
+        state["last_day"] = stats.get("last_usage_date")
+        state["streak"] = stats.get("consecutive_days", 0)
+        state["total_manifested"] = stats.get("total_manifested", 0.0)
+        state["sessions"] = stats.get("sessions_count", 0)
+        state["affirmations"] = len(user.get("custom_affirmations", []))
+        return state
+
+    def get_state(self, user: dict) -> dict:
+        user_id = user["user_id"]
+        state = self.states.get(user_id)
+        if state is None:
+            state = self.state_from_user(user)
+            self.states[user_id] = state
+            if len(self.states) > self.max_users:
+                self.states.popitem(last=False)
+        else:
+            self.states.move_to_end(user_id)
+        return state
+
+    def forget(self, user_id: str):
+        self.states.pop(user_id, None)
+
+    @staticmethod
+    def apply(state: dict, event: str, amount: float = 0.0, day: Optional[str] = None) -> List[dict]:
+        if event == "generate":
+            state["total_manifested"] += amount
+            touched = ["total_manifested", "streak"]
+            if day and day != state["last_day"]:
+                previous = state["last_day"]
+                if previous and date.fromisoformat(day) - date.fromisoformat(previous) == timedelta(days=1):
+                    state["streak"] += 1
+                else:
+                    state["streak"] = 1
+                state["last_day"] = day
+        elif event == "session":
+            state["sessions"] += 1
+            touched = ["sessions"]
+        elif event == "affirmation":
+            state["affirmations"] += 1
+            touched = ["affirmations"]
+        else:
+            raise ValueError(f"Unknown achievement event: {event}")
+
+        unlocked = []
+        for rule in touched:
+            rules = ACHIEVEMENT_RULES.get(rule, [])
+            index = state["next_rule"][rule]
+            while index < len(rules) and state[rule] >= rules[index]["threshold"]:
+                achievement = rules[index]
+                if achievement["id"] not in state["unlocked"]:
+                    state["unlocked"].add(achievement["id"])
+                    unlocked.append(achievement)
+                index += 1
+            state["next_rule"][rule] = index
+        return unlocked
+
+    def record(self, user: dict, event: str, amount: float = 0.0, day: Optional[str] = None) -> List[dict]:
+        return self.apply(self.get_state(user), event, amount, day)
+
+achievement_engine = AchievementEngine()
+
+def achievement_entry(achievement: dict, unlocked_at: Optional[datetime] = None) -> dict:
+    return Achievement(
+        id=achievement["id"],
+        name=achievement["name"],
+        description=achievement["description"],
+        icon=achievement["icon"],
+        unlocked_at=unlocked_at or datetime.utcnow()
+    ).dict()
+
+async def save_unlocked_achievements(user_id: str, unlocked: List[dict], unlocked_at: Optional[datetime] = None):
+    if not unlocked:
+        return
+    unlocked_at = unlocked_at or datetime.utcnow()
+    await storage.add_achievements(user_id, [achievement_entry(a, unlocked_at) for a in unlocked])
+
+async def backfill_achievements(user_id: Optional[str] = None, batch_size: int = 1000) -> Dict[str, int]:
+    # Replay every user's historical notifications in timestamp order, merged with
+    # the users collection by user_id. Sessions and affirmations are not logged as
+    # notifications, so their counters come from the user document; users without
+    # notifications are still visited for them.
+    users_processed = 0
+    events_replayed = 0
+    achievements_unlocked = 0
+
+    async def iter_users():
+        if user_id is None:
+            async for user in storage.iter_users(batch_size):
+                yield user
+        else:
+            user = await storage.get_user(user_id)
+            if user:
+                yield user
+
+    notifications = storage.iter_notifications(user_id, batch_size)
+    notification = await anext(notifications, None)
+
+    async for user in iter_users():
+        current_user_id = user["user_id"]
+        # Notifications of users that no longer exist have nowhere to go
+        while notification is not None and notification["user_id"] < current_user_id:
+            notification = await anext(notifications, None)
+
+        state = AchievementEngine.new_state(a["id"] for a in user.get("achievements", []))
+        # (achievement, time the replayed event crossed its threshold)
+        unlocked = []
+        for _ in range(user.get("stats", {}).get("sessions_count", 0)):
+            # Sessions are only counted, so their unlock time is the time of the backfill
+            unlocked += [(a, None) for a in AchievementEngine.apply(state, "session")]
+        for affirmation in user.get("custom_affirmations", []):
+            unlocked += [(a, affirmation.get("created_at")) for a in AchievementEngine.apply(state, "affirmation")]
+
+        while notification is not None and notification["user_id"] == current_user_id:
+            timestamp = notification.get("timestamp") or datetime.utcnow()
+            unlocked += [
+                (a, timestamp) for a in AchievementEngine.apply(
+                    state, "generate", notification.get("amount", 0), timestamp.strftime("%Y-%m-%d")
+                )
+            ]
+            events_replayed += 1
+            notification = await anext(notifications, None)
+
+        if unlocked:
+            await storage.add_achievements(current_user_id, [achievement_entry(a, at) for a, at in unlocked])
+        # Persist the recomputed streak so the live engine seeds from it
+        if state["last_day"]:
+            await storage.set_streak(current_user_id, state["streak"], state["last_day"])
+        achievement_engine.forget(current_user_id)
+        users_processed += 1
+        achievements_unlocked += len(unlocked)
+    await notifications.aclose()
+
+    return {
+        "users_processed": users_processed,
+        "events_replayed": events_replayed,
+        "achievements_unlocked": achievements_unlocked
+    }
+
+# Write-behind buffer for per-user stats. Generate calls only touch memory;
+# deltas are coalesced per user and flushed in one batch.
+class StatsBuffer:
+    def __init__(self):
+        self.pending = {}
+        self.usage = {}
+
+    def daily_usage(self, user: dict, today: str) -> int:
+        # In-memory counter keeps the free-tier limit exact between flushes
+        usage = self.usage.get(user["user_id"])
+        if usage and usage[0] == today:
+            return usage[1]
+        stats = user.get("stats", {})
+        return stats.get("daily_usage", 0) if stats.get("last_usage_date") == today else 0
+
+    def record_usage(self, user: dict, today: str, amount: float, consecutive_days: int) -> int:
+        user_id = user["user_id"]
+        daily_usage = self.daily_usage(user, today) + 1
+        self.usage[user_id] = (today, daily_usage)
+
+        # Whether daily_usage continues the stored counter or restarts it is
+        # decided by the storage backend at flush time, against the stored day
+        entry = self.pending.get(user_id)
+        if entry is None or entry["last_usage_date"] != today:
+            entry = {
+                "daily_usage": 0,
+                "total_manifested": entry["total_manifested"] if entry else 0.0,
+                "last_usage_date": today,
+                "consecutive_days": consecutive_days,
+            }
+            self.pending[user_id] = entry
+        entry["daily_usage"] += 1
+        entry["total_manifested"] += amount
+        entry["consecutive_days"] = consecutive_days
+        return daily_usage
+
+    def apply_pending(self, user_id: str, stats: dict) -> dict:
+        entry = self.pending.get(user_id)
+        if not entry:
+            return stats
+        stats = dict(stats)
+        stats["total_manifested"] = stats.get("total_manifested", 0) + entry["total_manifested"]
+        same_day = stats.get("last_usage_date") == entry["last_usage_date"]
+        stats["daily_usage"] = entry["daily_usage"] + (stats.get("daily_usage", 0) if same_day else 0)
+        stats["last_usage_date"] = entry["last_usage_date"]
+        stats["consecutive_days"] = entry["consecutive_days"]
+        return stats
+
+    def discard(self, user_id: str):
+        self.pending.pop(user_id, None)
+        self.usage.pop(user_id, None)
+
+    def merge_back(self, failed: dict):
+        # Put unflushed deltas back in front of anything recorded since
+        for user_id, entry in failed.items():
+            newer = self.pending.get(user_id)
+            if newer is None:
+                self.pending[user_id] = entry
+            elif newer["last_usage_date"] == entry["last_usage_date"]:
+                newer["daily_usage"] += entry["daily_usage"]
+                newer["total_manifested"] += entry["total_manifested"]
+            else:
+                newer["total_manifested"] += entry["total_manifested"]
+
+    async def flush(self):
+        if not self.pending:
+            return
+        pending, self.pending = self.pending, {}
+
+        try:
+            failed = await storage.apply_stats_deltas(pending)
+        except Exception:
+            self.merge_back(pending)
+            raise
+        # Only the rejected users are retried; the rest are already applied
+        if failed:
+            self.merge_back({user_id: pending[user_id] for user_id in failed})
+            raise RuntimeError(f"{len(failed)} of {len(pending)} stats updates failed")
+
+        # Counters from previous days are no longer needed for the limit check
+        today = datetime.utcnow().strftime("%Y-%m-%d")
+        self.usage = {user_id: usage for user_id, usage in self.usage.items() if usage[0] == today}
+
+    async def run(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"Stats flush failed, will retry: {e}")
+
+stats_buffer = StatsBuffer()
+
+# Presence tracking. Distinct users are counted with HyperLogLog sketches kept
+# per time bucket; sketches merge by taking the register-wise max, so windows
+# are unions of buckets and workers combine counts by exchanging registers.
+HLL_PRECISION = 10
+HLL_REGISTERS = 1 << HLL_PRECISION
+
+def hll_add(registers: bytearray, value: str):
+    hashed = int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest(), "big")
+    index = hashed >> (64 - HLL_PRECISION)
+    remainder = hashed & ((1 << (64 - HLL_PRECISION)) - 1)
+    rank = (64 - HLL_PRECISION) - remainder.bit_length() + 1
+    if rank > registers[index]:
+        registers[index] = rank
+
+def hll_merge(target: bytearray, other: bytes):
+    target[:] = bytes(map(max, target, other))
+
+def hll_count(registers: bytes) -> int:
+    alpha = 0.7213 / (1 + 1.079 / HLL_REGISTERS)
+    estimate = alpha * HLL_REGISTERS * HLL_REGISTERS / sum(2.0 ** -r for r in registers)
+    zeros = registers.count(0)
+    if estimate <= 2.5 * HLL_REGISTERS and zeros:
+        estimate = HLL_REGISTERS * math.log(HLL_REGISTERS / zeros)
+    return int(round(estimate))
+
+# window name -> (window length, bucket width) in seconds
+PRESENCE_WINDOWS = {
+    "1m": (60, 10),
+    "5m": (300, 10),
+    "1h": (3600, 60),
+}
+
+class PresenceTracker:
+    def __init__(self, worker_id: str = WORKER_ID):
+        self.worker_id = worker_id
+        self.bucket_widths = sorted({width for _, width in PRESENCE_WINDOWS.values()})
+        self.retention = {
+            width: max(length for length, w in PRESENCE_WINDOWS.values() if w == width)
+            for width in self.bucket_widths
+        }
+        # bucket width -> bucket start -> registers
+        self.buckets = {width: {} for width in self.bucket_widths}
+        self.counts = {window: 0 for window in PRESENCE_WINDOWS}
+
+    def record(self, user_id: str, now: Optional[float] = None):
+        now = now or time.time()
+        for width, buckets in self.buckets.items():
+            start = int(now // width * width)
+            registers = buckets.get(start)
+            if registers is None:
+                registers = buckets[start] = bytearray(HLL_REGISTERS)
+            hll_add(registers, user_id)
+
+    def prune(self, now: float):
+        for width, buckets in self.buckets.items():
+            oldest = now - self.retention[width] - width
+            for start in [start for start in buckets if start < oldest]:
+                del buckets[start]
+
+    def export_state(self) -> Dict[str, Dict[str, bytes]]:
+        return {
+            str(width): {str(start): bytes(registers) for start, registers in buckets.items()}
+            for width, buckets in self.buckets.items()
+        }
+
+    @staticmethod
+    def merge_states(target: Dict[int, Dict[int, bytearray]], state: Dict[str, Dict[str, bytes]]):
+        for width, buckets in state.items():
+            merged = target.setdefault(int(width), {})
+            for start, registers in buckets.items():
+                start = int(start)
+                if start in merged:
+                    hll_merge(merged[start], registers)
+                else:
+                    merged[start] = bytearray(registers)
+
+    def compute_counts(self, buckets: Dict[int, Dict[int, bytearray]], now: float) -> Dict[str, int]:
+        counts = {}
+        for window, (length, width) in PRESENCE_WINDOWS.items():
+            union = bytearray(HLL_REGISTERS)
+            for start, registers in buckets.get(width, {}).items():
+                if start + width > now - length:
+                    hll_merge(union, registers)
+            counts[window] = hll_count(union)
+        return counts
+
+    async def refresh(self):
+        now = time.time()
+        self.prune(now)
+        state = self.export_state()
+        merged = {}
+        self.merge_states(merged, state)
+
+        if storage is not None:
+            await storage.save_presence(self.worker_id, state)
+            # Other workers' sketches; stale documents only hold expired buckets
+            since = datetime.utcnow() - timedelta(seconds=max(length for length, _ in PRESENCE_WINDOWS.values()))
+            for buckets in await storage.load_presence(self.worker_id, since):
+                self.merge_states(merged, buckets)
+
+        self.counts = self.compute_counts(merged, now)
+
+    async def run(self, interval: float):
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f"Presence refresh failed, will retry: {e}")
+            await asyncio.sleep(interval)
+
+presence_tracker = PresenceTracker()
+
+# Success story moderation. Submissions are queued and checked by background
+# workers; approved stories are published in batches and kept in a cached feed.
+SUCCESS_STORY_FEED_SIZE = 10
+STORY_MAX_AMOUNT = 1000000
+STORY_MAX_DESCRIPTION = 500
+STORY_LINK_PATTERN = re.compile(r"(https?://|www\.|\.(com|net|org|io|ru|xyz)\b)", re.IGNORECASE)
+STORY_CODE_PATTERN = re.compile(r"^\d{3,20}$")
+
+def story_content_hash(story: dict) -> str:
+    description = " ".join((story.get("description") or "").lower().split())
+    key = f"{story['user_id']}|{story['amount']:.2f}|{story['code']}|{description}"
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+def check_story_content(story: dict) -> Optional[str]:
+    if not 0 < story["amount"] <= STORY_MAX_AMOUNT:
+        return "amount out of range"
+    if not STORY_CODE_PATTERN.match(story["code"]):
+        return "invalid code"
+    description = story.get("description") or ""
+    if len(description) > STORY_MAX_DESCRIPTION:
+        return "description too long"
+    if STORY_LINK_PATTERN.search(description):
+        return "links are not allowed"
+    return None
+
+class StoryModerationQueue:
+    def __init__(self, maxsize: int = STORY_QUEUE_SIZE):
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.approved = []
+        self.recent_hashes = OrderedDict()
+        self.feed = None
+        self.feed_loaded_at = 0.0
+        self.feed_lock = asyncio.Lock()
+        self.tasks = []
+        self.stats = {"accepted": 0, "published": 0, "duplicates": 0, "rejected": 0}
+        # rejection reason -> count
+        self.rejections = {}
+
+    def submit(self, story: dict) -> bool:
+        try:
+            self.queue.put_nowait(story)
+        except asyncio.QueueFull:
+            return False
+        self.stats["accepted"] += 1
+        return True
+
+    def moderate(self, story: dict):
+        content_hash = story_content_hash(story)
+        if content_hash in self.recent_hashes:
+            self.stats["duplicates"] += 1
+            return
+        self.recent_hashes[content_hash] = True
+        if len(self.recent_hashes) > STORY_QUEUE_SIZE:
+            self.recent_hashes.popitem(last=False)
+
+        reason = check_story_content(story)
+        if reason:
+            self.stats["rejected"] += 1
+            self.rejections[reason] = self.rejections.get(reason, 0) + 1
+            return
+
+        story["content_hash"] = content_hash
+        self.approved.append(story)
+
+    async def worker(self):
+        while True:
+            story = await self.queue.get()
+            try:
+                self.moderate(story)
+                if len(self.approved) >= STORY_PUBLISH_BATCH_SIZE:
+                    await self.publish()
+            except Exception as e:
+                print(f"Success story moderation failed: {e}")
+            finally:
+                self.queue.task_done()
+
+    async def publisher(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.publish()
+            except Exception as e:
+                print(f"Success story publish failed, will retry: {e}")
+
+    async def publish(self):
+        if not self.approved:
+            return
+        batch, self.approved = self.approved, []
+
+        try:
+            _, errors = await storage.insert_stories(batch)
+        except Exception:
+            self.approved = batch + self.approved
+            raise
+
+        failed = {error["index"] for error in errors}
+        self.stats["duplicates"] += sum(1 for error in errors if error["duplicate"])
+        published = [story for index, story in enumerate(batch) if index not in failed]
+        self.stats["published"] += len(published)
+        if self.feed is not None:
+            self.feed = self.merge_feed(self.feed, published)
+
+    @staticmethod
+    def public_story(story: dict) -> dict:
+        return {key: story.get(key) for key in ("amount", "code", "description", "created_at")}
+
+    def merge_feed(self, feed: List[dict], stories: List[dict]) -> List[dict]:
+        merged = feed + [self.public_story(story) for story in stories]
+        merged.sort(key=lambda story: story["created_at"], reverse=True)
+        return merged[:SUCCESS_STORY_FEED_SIZE]
+
+    def feed_expired(self) -> bool:
+        return self.feed is None or time.monotonic() - self.feed_loaded_at >= STORY_FEED_TTL
+
+    async def get_feed(self) -> List[dict]:
+        # Reloaded periodically so stories published by other workers show up
+        if self.feed_expired():
+            async with self.feed_lock:
+                if self.feed_expired():
+                    stories = await storage.recent_stories(SUCCESS_STORY_FEED_SIZE)
+                    self.feed = [self.public_story(story) for story in stories]
+                    self.feed_loaded_at = time.monotonic()
+        return self.feed
+
+    def start(self, workers: int):
+        self.tasks = [asyncio.create_task(self.worker()) for _ in range(workers)]
+        self.tasks.append(asyncio.create_task(self.publisher(STORY_PUBLISH_INTERVAL)))
+
+    async def stop(self):
+        # Drain what was already accepted before shutting down
+        if self.tasks:
+            await self.queue.join()
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+        await self.publish()
+
+story_queue = StoryModerationQueue()
+
 # API Endpoints
 
 @app.get("/api/health")
 async def health_check():
     return {"status": "healthy", "timestamp": datetime.utcnow()}
 
+@app.get("/api/health/live")
+async def liveness_check():
+    return {"status": "alive"}
+
+@app.get("/api/health/ready")
+async def readiness_check():
+    # Ready once MongoDB answers and the indexes registration relies on exist
+    database_ready = False
+    if storage is not None:
+        try:
+            await asyncio.wait_for(storage.ping(), timeout=READINESS_PING_TIMEOUT)
+            database_ready = True
+        except Exception:
+            pass
+    
+    ready = database_ready and indexes_ready
+    body = {"status": "ready" if ready else "not_ready", "database": database_ready, "indexes": indexes_ready}
+    if not ready:
+        return JSONResponse(status_code=503, content=body)
+    return body
+
 @app.post("/api/auth/register")
 async def register_user(user_data: UserRegister):
-    # Check if user exists
-    existing_user = await database.users.find_one({"email": user_data.email})
-    if existing_user:
-        raise HTTPException(status_code=400, detail="Email already registered")
-    
-    # Create new user
-    user_id = str(uuid.uuid4())
-    hashed_password = hash_password(user_data.password)
-    
-    new_user = {
-        "user_id": user_id,
-        "email": user_data.email,
-        "name": user_data.name,
-        "password": hashed_password,
-        "is_pro": False,
-        "created_at": datetime.utcnow(),
-        "subscription_status": None,
-        "subscription_ends_at": None,
-        "settings": ManifestationSettings().dict(),
-        "stats": UserStats().dict(),
-        "achievements": [],
-        "custom_affirmations": [],
-        "social_proof_submissions": []
-    }
+    # Create new user; the unique email index rejects duplicates
+    hashed_password = await hash_password_async(user_data.password)
+    new_user = new_user_document(user_data.email, user_data.name, hashed_password)
+    user_id = new_user["user_id"]
     
-    await database.users.insert_one(new_user)
+    try:
+        await storage.insert_user(new_user)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Email already registered")
     
     # Create access token
     access_token = create_access_token(data={"sub": user_id})
@@ -248,8 +1099,8 @@ async def register_user(user_data: UserRegister):
 @app.post("/api/auth/login")
 async def login_user(user_data: UserLogin):
     # Find user
-    user = await database.users.find_one({"email": user_data.email})
-    if not user or not verify_password(user_data.password, user["password"]):
+    user = await storage.get_user_by_email(user_data.email)
+    if not user or not await verify_password_async(user_data.password, user["password"]):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
     # Create access token
@@ -269,6 +1120,67 @@ async def login_user(user_data: UserLogin):
         )
     }
 
+async def require_admin_key(x_admin_key: str = Header(default="")):
+    if not ADMIN_API_KEY or not hmac.compare_digest(x_admin_key.encode(), ADMIN_API_KEY.encode()):
+        raise HTTPException(status_code=403, detail="Admin access required")
+
+# Modular crypt format written by bcrypt: $2a$/$2b$/$2y$, cost, 53 chars of salt + digest
+BCRYPT_HASH_PATTERN = re.compile(r"^\$2[aby]\$\d{2}\$[./A-Za-z0-9]{53}$")
+
+async def prepare_import_row(index: int, row: Any):
+    if not isinstance(row, dict):
+        return None, {"row": index, "email": None, "error": "row must be an object"}
+    try:
+        entry = UserImportEntry(**row)
+    except ValidationError as e:
+        return None, {"row": index, "email": row.get("email"), "error": str(e.errors()[0]["msg"])}
+    
+    if entry.password_hash:
+        if not BCRYPT_HASH_PATTERN.match(entry.password_hash):
+            return None, {"row": index, "email": entry.email, "error": "password_hash is not a bcrypt hash"}
+        hashed_password = entry.password_hash
+    elif entry.password:
+        hashed_password = await hash_password_async(entry.password)
+    else:
+        return None, {"row": index, "email": entry.email, "error": "password or password_hash is required"}
+    
+    return new_user_document(entry.email, entry.name, hashed_password, entry.is_pro, entry.created_at), None
+
+@app.post("/api/admin/users/import", dependencies=[Depends(require_admin_key)])
+async def import_users(request: UserImportRequest):
+    imported = 0
+    errors = []
+    
+    for start in range(0, len(request.users), USER_IMPORT_BATCH_SIZE):
+        rows = request.users[start:start + USER_IMPORT_BATCH_SIZE]
+        prepared = await asyncio.gather(*(
+            prepare_import_row(start + offset, row) for offset, row in enumerate(rows)
+        ))
+        
+        documents = []
+        row_numbers = []
+        for offset, (document, error) in enumerate(prepared):
+            if error:
+                errors.append(error)
+            else:
+                documents.append(document)
+                row_numbers.append(start + offset)
+        
+        if not documents:
+            continue
+        
+        inserted, insert_errors = await storage.insert_users(documents)
+        imported += inserted
+        for insert_error in insert_errors:
+            errors.append({
+                "row": row_numbers[insert_error["index"]],
+                "email": documents[insert_error["index"]]["email"],
+                "error": "Email already registered" if insert_error["duplicate"] else insert_error["message"]
+            })
+    
+    errors.sort(key=lambda error: error["row"])
+    return {"total": len(request.users), "imported": imported, "failed": len(errors), "errors": errors}
+
 @app.get("/api/user/profile")
 async def get_user_profile(current_user: dict = Depends(get_current_user)):
     return UserProfile(
@@ -290,36 +1202,46 @@ async def update_user_settings(
     settings: ManifestationSettings,
     current_user: dict = Depends(get_current_user)
 ):
-    await database.users.update_one(
-        {"user_id": current_user["user_id"]},
-        {"$set": {"settings": settings.dict()}}
-    )
+    await storage.update_settings(current_user["user_id"], settings.dict())
     return {"message": "Settings updated successfully"}
 
 @app.get("/api/user/stats")
 async def get_user_stats(current_user: dict = Depends(get_current_user)):
-    return current_user.get("stats", UserStats().dict())
+    return stats_buffer.apply_pending(current_user["user_id"], current_user.get("stats", UserStats().dict()))
 
 @app.put("/api/user/stats")
 async def update_user_stats(
     stats: UserStats,
     current_user: dict = Depends(get_current_user)
 ):
-    await database.users.update_one(
-        {"user_id": current_user["user_id"]},
-        {"$set": {"stats": stats.dict()}}
-    )
+    await storage.set_stats(current_user["user_id"], stats.dict())
+    achievement_engine.forget(current_user["user_id"])
+    stats_buffer.discard(current_user["user_id"])
     return {"message": "Stats updated successfully"}
 
+@app.post("/api/user/sessions")
+async def record_session(current_user: dict = Depends(get_current_user)):
+    await storage.increment_sessions(current_user["user_id"])
+    unlocked = achievement_engine.record(current_user, "session")
+    await save_unlocked_achievements(current_user["user_id"], unlocked)
+    return {"message": "Session recorded", "unlocked_achievements": [a["id"] for a in unlocked]}
+
+@app.get("/api/user/achievements")
+async def get_user_achievements(current_user: dict = Depends(get_current_user)):
+    return current_user.get("achievements", [])
+
+@app.post("/api/user/achievements/backfill")
+async def backfill_user_achievements(current_user: dict = Depends(get_current_user)):
+    return await backfill_achievements(current_user["user_id"])
+
 @app.get("/api/manifestation/generate")
 async def generate_manifestation(current_user: dict = Depends(get_current_user)):
     settings = current_user.get("settings", {})
     
     # Check daily limits for free users
-    stats = current_user.get("stats", {})
     today = datetime.utcnow().strftime("%Y-%m-%d")
     
-    if not current_user["is_pro"] and stats.get("last_usage_date") == today and stats.get("daily_usage", 0) >= 10:
+    if not current_user["is_pro"] and stats_buffer.daily_usage(current_user, today) >= 10:
         raise HTTPException(status_code=429, detail="Daily limit reached. Upgrade to Pro for unlimited manifestations.")
     
     # Generate random manifestation
@@ -360,19 +1282,14 @@ async def generate_manifestation(current_user: dict = Depends(get_current_user))
     if current_user["is_pro"] and settings.get("grabovai_enabled"):
         grabovoi_code = random.choice(GRABOVOI_CODES)["code"]
     
-    # Update daily usage
-    new_daily_usage = 1 if stats.get("last_usage_date") != today else stats.get("daily_usage", 0) + 1
+    # Advance achievement rules (streak, totals) for this event
+    achievement_state = achievement_engine.get_state(current_user)
+    unlocked = AchievementEngine.apply(achievement_state, "generate", amount, today)
     
-    await database.users.update_one(
-        {"user_id": current_user["user_id"]},
-        {
-            "$set": {
-                "stats.daily_usage": new_daily_usage,
-                "stats.last_usage_date": today,
-                "stats.total_manifested": stats.get("total_manifested", 0) + amount
-            }
-        }
-    )
+    # Update daily usage (flushed to the users collection in the background)
+    stats_buffer.record_usage(current_user, today, amount, achievement_state["streak"])
+    
+    await save_unlocked_achievements(current_user["user_id"], unlocked)
     
     # Log notification
     notification_log = NotificationLog(
@@ -384,7 +1301,7 @@ async def generate_manifestation(current_user: dict = Depends(get_current_user))
         grabovoi_code=grabovoi_code
     )
     
-    await database.notifications.insert_one(notification_log.dict())
+    await storage.insert_notification(notification_log.dict())
     
     return {
         "amount": amount,
@@ -392,7 +1309,8 @@ async def generate_manifestation(current_user: dict = Depends(get_current_user))
         "bank": bank,
         "manifestation_type": manifestation_type,
         "grabovoi_code": grabovoi_code,
-        "timestamp": datetime.utcnow()
+        "timestamp": datetime.utcnow(),
+        "unlocked_achievements": [a["id"] for a in unlocked]
     }
 
 @app.get("/api/grabovoi/codes")
@@ -408,15 +1326,14 @@ async def get_daily_grabovoi_code():
 
 @app.get("/api/social-proof/active-users")
 async def get_active_users():
-    # Simulate active users count
-    base_count = 1247
-    variation = random.randint(-50, 100)
-    return {"active_users": base_count + variation}
+    # Counts are refreshed in the background by the presence tracker
+    counts = presence_tracker.counts
+    return {"active_users": counts["5m"], "windows": counts}
 
 @app.get("/api/social-proof/success-stories")
 async def get_success_stories():
     # Get recent success stories
-    stories = await database.social_proof.find().sort("created_at", -1).limit(10).to_list(length=10)
+    stories = await story_queue.get_feed()
     if not stories:
         # Return sample stories if none exist
         return [{
@@ -428,14 +1345,16 @@ async def get_success_stories():
     
     return stories
 
-@app.post("/api/social-proof/submit")
+@app.post("/api/social-proof/submit", status_code=status.HTTP_202_ACCEPTED)
 async def submit_success_story(
     story: SocialProofEntry,
     current_user: dict = Depends(get_current_user)
 ):
     story.user_id = current_user["user_id"]
-    await database.social_proof.insert_one(story.dict())
-    return {"message": "Success story submitted"}
+    story.created_at = datetime.utcnow()
+    if not story_queue.submit(story.dict()):
+        raise HTTPException(status_code=503, detail="Too many submissions, please try again later")
+    return {"message": "Success story submitted for review"}
 
 @app.get("/api/user/affirmations")
 async def get_custom_affirmations(current_user: dict = Depends(get_current_user)):
@@ -446,11 +1365,10 @@ async def add_custom_affirmation(
     affirmation: CustomAffirmation,
     current_user: dict = Depends(get_current_user)
 ):
-    await database.users.update_one(
-        {"user_id": current_user["user_id"]},
-        {"$push": {"custom_affirmations": affirmation.dict()}}
-    )
-    return {"message": "Affirmation added"}
+    await storage.add_affirmation(current_user["user_id"], affirmation.dict())
+    unlocked = achievement_engine.record(current_user, "affirmation")
+    await save_unlocked_achievements(current_user["user_id"], unlocked)
+    return {"message": "Affirmation added", "unlocked_achievements": [a["id"] for a in unlocked]}
 
 @app.post("/api/subscription/create-checkout-session")
 async def create_checkout_session(
@@ -463,7 +1381,7 @@ async def create_checkout_session(
     price_id = "price_monthly_444" if plan_type == "monthly" else "price_yearly_2999"
     
     try:
-        checkout_session = stripe.checkout.Session.create(
+        checkout_session = get_stripe().checkout.Session.create(
             payment_method_types=['card'],
             line_items=[{
                 'price_data': {
@@ -494,12 +1412,8 @@ async def create_checkout_session(
 @app.get("/api/community/stats")
 async def get_community_stats():
     # Aggregate community statistics
-    total_users = await database.users.count_documents({})
-    total_manifested = await database.notifications.aggregate([
-        {"$group": {"_id": None, "total": {"$sum": "$amount"}}}
-    ]).to_list(length=1)
-    
-    total_amount = total_manifested[0]["total"] if total_manifested else 0
+    total_users = await storage.count_users()
+    total_amount = await storage.total_manifested()
     
     return {
         "total_users": max(total_users, 28000),  # Minimum for social proof
@@ -508,6 +1422,73 @@ async def get_community_stats():
         "notifications_sent": max(total_users * 100, 1200000)
     }
 
+# Frontend bundle. Hashed files under /static never change, so they are cached
+# for a year; everything else is revalidated. Precompressed .br/.gz siblings
+# (see precompress_static.py) are served when the client accepts them.
+PRECOMPRESSED_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+class PrecompressedStaticFiles(StaticFiles):
+    def __init__(self, *args, immutable_prefix: str = "static/", **kwargs):
+        super().__init__(*args, **kwargs)
+        self.immutable_prefix = immutable_prefix
+
+    def is_not_modified(self, response_headers: Headers, request_headers: Headers) -> bool:
+        # If-None-Match uses weak comparison, so the W/"..." form CompressionMiddleware
+        # gives compressed files still matches the bare ETag FileResponse computes
+        etag = response_headers.get("etag")
+        if_none_match = request_headers.get("if-none-match")
+        if etag and if_none_match:
+            candidates = [opaque_etag(tag) for tag in if_none_match.split(",")]
+            return "*" in candidates or opaque_etag(etag) in candidates
+        return super().is_not_modified(response_headers, request_headers)
+
+    def find_variants(self, path: str) -> List[str]:
+        full_path, stat_result = self.lookup_path(path)
+        if stat_result is None or not stat.S_ISREG(stat_result.st_mode):
+            return []
+        return [encoding for encoding, suffix in PRECOMPRESSED_SUFFIXES.items()
+                if self.lookup_path(path + suffix)[1] is not None]
+
+    async def get_response(self, path: str, scope):
+        if path in ("", "."):
+            path = "index.html"
+        elif scope["path"].endswith("/"):
+            path = os.path.join(path, "index.html")
+        variants = await asyncio.to_thread(self.find_variants, path)
+        encoding = choose_encoding(Headers(scope=scope), variants) if variants else None
+
+        if encoding:
+            response = await super().get_response(path + PRECOMPRESSED_SUFFIXES[encoding], scope)
+            response.headers["content-encoding"] = encoding
+            content_type, _ = mimetypes.guess_type(path)
+            if content_type:
+                response.headers["content-type"] = content_type
+        else:
+            response = await super().get_response(path, scope)
+
+        if variants:
+            add_vary_accept_encoding(response.headers)
+        if path.replace(os.sep, "/").startswith(self.immutable_prefix):
+            response.headers["cache-control"] = "public, max-age=31536000, immutable"
+        else:
+            response.headers["cache-control"] = "no-cache"
+        return response
+
+if os.path.isdir(FRONTEND_BUILD_DIR):
+    app.mount("/", PrecompressedStaticFiles(directory=FRONTEND_BUILD_DIR, html=True), name="frontend")
+
+async def run_achievement_backfill():
+    global storage
+    storage = create_storage()
+    await storage.connect()
+    try:
+        print(await backfill_achievements())
+    finally:
+        await storage.close()
+
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8001)
\ No newline at end of file
+    if len(sys.argv) > 1 and sys.argv[1] == "backfill-achievements":
+        asyncio.run(run_achievement_backfill())
+    else:
+        import uvicorn
+        uvicorn.run(app, host="0.0.0.0", port=8001)
\ No newline at end of file
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+DigiManifest startup benchmark
+Reports how long importing the backend takes, broken down per module
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def measure_import(module, runs):
+    """Import the module in fresh interpreters and collect -X importtime output"""
+    wall_times = []
+    package_times = {}
+    module_times = {}
+
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=BACKEND_DIR,
+            capture_output=True,
+            text=True,
+        )
+        wall_times.append(time.perf_counter() - started)
+
+        if result.returncode != 0:
+            print(result.stderr, file=sys.stderr)
+            raise SystemExit(f"Importing {module} failed")
+
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "self [us]" in line:
+                continue
+            self_us, cumulative_us, name = line[len("import time:"):].split("|")
+            name = name.strip()
+            # Self time summed per top-level package attributes every microsecond once
+            package = name.split(".")[0]
+            package_times[package] = package_times.get(package, 0) + int(self_us)
+            module_times[name] = int(cumulative_us)
+
+    package_times = {name: us / runs for name, us in package_times.items()}
+    return wall_times, package_times, module_times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--module", default="server", help="module to import (default: server)")
+    parser.add_argument("--runs", type=int, default=5, help="number of fresh interpreters to average over")
+    parser.add_argument("--top", type=int, default=15, help="number of modules to list")
+    args = parser.parse_args()
+
+    wall_times, package_times, module_times = measure_import(args.module, args.runs)
+
+    print(f"🚀 Import benchmark for '{args.module}' ({args.runs} runs)")
+    print("=" * 50)
+    print(f"Process start + import: best {min(wall_times) * 1000:.1f} ms, mean {sum(wall_times) / len(wall_times) * 1000:.1f} ms")
+    print(f"Module import total:    {module_times.get(args.module, 0) / 1000:.1f} ms (last run)")
+    print()
+    print(f"{'package':<30}{'import ms':>12}{'share':>9}")
+    print("-" * 51)
+    total = sum(package_times.values()) or 1
+    ranked = sorted(package_times, key=lambda name: package_times[name], reverse=True)
+    for name in ranked[:args.top]:
+        print(f"{name:<30}{package_times[name] / 1000:>12.1f}{package_times[name] / total:>9.1%}")
+
+    # Lazily initialised subsystems should not show up here
+    for name in ("stripe", "bcrypt"):
+        if name in package_times:
+            print(f"⚠️  {name} is imported at startup")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
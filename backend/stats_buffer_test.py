@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+DigiManifest stats buffer test suite
+Checks coalescing, day rollover and flush failures against the SQLite backend
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import uuid
+
+import server
+from storage import SQLiteStorage
+
+
+class FailingStorage(SQLiteStorage):
+    """SQLite backend whose stats flush can be made to fail for some or all users"""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.fail_all = False
+        self.fail_users = set()
+        self.closed = False
+
+    async def apply_stats_deltas(self, deltas):
+        if self.fail_all:
+            raise RuntimeError("storage unavailable")
+        applied = {user_id: entry for user_id, entry in deltas.items() if user_id not in self.fail_users}
+        await super().apply_stats_deltas(applied)
+        return [user_id for user_id in deltas if user_id in self.fail_users]
+
+    async def close(self):
+        self.closed = True
+        await super().close()
+
+
+class StatsBufferTester:
+    def __init__(self, storage):
+        self.storage = storage
+        self.tests_run = 0
+        self.tests_passed = 0
+
+    def log_test(self, name, success, details=""):
+        """Log test results"""
+        self.tests_run += 1
+        if success:
+            self.tests_passed += 1
+            print(f"✅ {name} - PASSED {details}")
+        else:
+            print(f"❌ {name} - FAILED {details}")
+        return success
+
+    async def new_user(self, last_usage_date=None, daily_usage=0, storage=None):
+        user = server.new_user_document(f"{uuid.uuid4()}@example.com", "Buffer Test", "hash")
+        user["stats"]["last_usage_date"] = last_usage_date
+        user["stats"]["daily_usage"] = daily_usage
+        await (storage or self.storage).insert_user(user)
+        return user
+
+    async def stats(self, user):
+        return (await self.storage.get_user(user["user_id"]))["stats"]
+
+    async def test_coalescing(self):
+        buffer = server.StatsBuffer()
+        user = await self.new_user("2024-01-01", daily_usage=4)
+        for amount in (10.0, 20.0, 30.0):
+            usage = buffer.record_usage(user, "2024-01-01", amount, 1)
+        overlay = buffer.apply_pending(user["user_id"], user["stats"])
+        self.log_test("Coalesced Entry", len(buffer.pending) == 1 and buffer.pending[user["user_id"]]["daily_usage"] == 3
+                      and usage == 7 and overlay["daily_usage"] == 7, f"Pending: {buffer.pending}")
+
+        await buffer.flush()
+        stats = await self.stats(user)
+        self.log_test("Coalesced Flush", not buffer.pending and stats["daily_usage"] == 7
+                      and stats["total_manifested"] == 60.0, f"Stats: {stats}")
+
+    async def test_stale_snapshot(self):
+        # A request that read the user before the previous flush landed must
+        # not restart the counter that flush already wrote
+        buffer = server.StatsBuffer()
+        user = await self.new_user("2024-01-01", daily_usage=5)
+        buffer.record_usage(user, "2024-01-02", 1.0, 2)
+        buffer.record_usage(user, "2024-01-02", 1.0, 2)
+        await buffer.flush()
+        buffer.record_usage(user, "2024-01-02", 1.0, 2)
+        await buffer.flush()
+        stats = await self.stats(user)
+        self.log_test("Stale Snapshot Keeps Counter", stats["daily_usage"] == 3 and stats["total_manifested"] == 3.0,
+                      f"Stats: {stats}")
+
+    async def test_day_rollover(self):
+        buffer = server.StatsBuffer()
+        user = await self.new_user("2024-01-01", daily_usage=9)
+        buffer.record_usage(user, "2024-01-01", 5.0, 1)
+        usage = buffer.record_usage(user, "2024-01-02", 7.0, 2)
+        entry = buffer.pending[user["user_id"]]
+        self.log_test("Rollover Restarts Usage", usage == 1 and entry["daily_usage"] == 1
+                      and entry["total_manifested"] == 12.0 and entry["consecutive_days"] == 2, f"Entry: {entry}")
+
+        await buffer.flush()
+        stats = await self.stats(user)
+        self.log_test("Rollover Flush", stats["daily_usage"] == 1 and stats["last_usage_date"] == "2024-01-02"
+                      and stats["total_manifested"] == 12.0, f"Stats: {stats}")
+
+    async def test_flush_failure(self):
+        buffer = server.StatsBuffer()
+        user = await self.new_user("2024-01-01")
+        buffer.record_usage(user, "2024-01-01", 10.0, 1)
+
+        self.storage.fail_all = True
+        try:
+            await buffer.flush()
+            self.log_test("Failed Flush Raises", False, "Flush succeeded")
+        except RuntimeError:
+            self.log_test("Failed Flush Raises", True)
+        finally:
+            self.storage.fail_all = False
+
+        buffer.record_usage(user, "2024-01-01", 5.0, 1)
+        await buffer.flush()
+        stats = await self.stats(user)
+        self.log_test("Failed Flush Retried", stats["daily_usage"] == 2 and stats["total_manifested"] == 15.0, f"Stats: {stats}")
+
+    async def test_partial_failure(self):
+        buffer = server.StatsBuffer()
+        ok, failing = await self.new_user("2024-01-01"), await self.new_user("2024-01-01")
+        for user in (ok, failing):
+            buffer.record_usage(user, "2024-01-01", 10.0, 1)
+
+        self.storage.fail_users = {failing["user_id"]}
+        try:
+            await buffer.flush()
+        except RuntimeError:
+            pass
+        finally:
+            self.storage.fail_users = set()
+        self.log_test("Only Failed Users Kept", set(buffer.pending) == {failing["user_id"]}, f"Pending: {list(buffer.pending)}")
+
+        await buffer.flush()
+        ok_stats, failing_stats = await self.stats(ok), await self.stats(failing)
+        self.log_test("No Double Apply", ok_stats["total_manifested"] == 10.0 and ok_stats["daily_usage"] == 1
+                      and failing_stats["total_manifested"] == 10.0 and failing_stats["daily_usage"] == 1,
+                      f"Stats: {ok_stats}, {failing_stats}")
+
+    async def test_shutdown(self, path):
+        # A failing final flush must not keep the queue and storage open
+        storage = FailingStorage(path)
+        original_create, original_buffer = server.create_storage, server.stats_buffer
+        server.create_storage = lambda: storage
+        server.stats_buffer = server.StatsBuffer()
+        try:
+            async with server.lifespan(server.app):
+                user = await self.new_user(storage=storage)
+                server.stats_buffer.record_usage(user, "2024-01-01", 1.0, 1)
+                storage.fail_all = True
+            self.log_test("Shutdown Closes Storage", False, "Failed flush was not raised")
+        except RuntimeError:
+            self.log_test("Shutdown Closes Storage", storage.closed and not server.story_queue.tasks)
+        finally:
+            server.create_storage, server.stats_buffer = original_create, original_buffer
+
+    async def run(self, directory):
+        await self.storage.connect()
+        server.storage = self.storage
+        try:
+            await self.storage.ensure_indexes()
+            await self.test_coalescing()
+            await self.test_stale_snapshot()
+            await self.test_day_rollover()
+            await self.test_flush_failure()
+            await self.test_partial_failure()
+        finally:
+            await self.storage.close()
+        await self.test_shutdown(os.path.join(directory, "shutdown_test.db"))
+
+        print(f"\n📊 Test Results: {self.tests_passed}/{self.tests_run} tests passed")
+        return self.tests_passed == self.tests_run
+
+
+def main():
+    """Main test execution"""
+    print("🚀 Starting DigiManifest Stats Buffer Tests")
+    print("=" * 50)
+    with tempfile.TemporaryDirectory() as directory:
+        storage = FailingStorage(os.path.join(directory, "stats_buffer_test.db"))
+        success = asyncio.run(StatsBufferTester(storage).run(directory))
+    return 0 if success else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,633 @@
+"""
+DigiManifest storage backends
+Repository interface over the users, notifications, social_proof and presence
+collections, with a MongoDB (Motor) and an embedded SQLite implementation
+"""
+
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Optional, List, Dict, Any, AsyncIterator, Tuple
+import asyncio
+import base64
+import json
+import os
+import sqlite3
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError as MongoDuplicateKeyError, BulkWriteError
+from pymongo.read_preferences import Primary, PrimaryPreferred, Secondary, SecondaryPreferred, Nearest
+
+
+class DuplicateKeyError(Exception):
+    pass
+
+
+# Per-row insert failures reported by insert_users / insert_stories
+def insert_error(index: int, duplicate: bool, message: str) -> Dict[str, Any]:
+    return {"index": index, "duplicate": duplicate, "message": message}
+
+
+class StorageBackend(ABC):
+    # Lifecycle
+    @abstractmethod
+    async def connect(self): ...
+
+    @abstractmethod
+    async def close(self): ...
+
+    @abstractmethod
+    async def ensure_indexes(self): ...
+
+    @abstractmethod
+    async def ping(self): ...
+
+    # Users
+    @abstractmethod
+    async def get_user(self, user_id: str) -> Optional[dict]: ...
+
+    @abstractmethod
+    async def get_user_by_email(self, email: str) -> Optional[dict]: ...
+
+    @abstractmethod
+    async def insert_user(self, user: dict):
+        # Raises DuplicateKeyError when the email or user_id is taken
+        ...
+
+    @abstractmethod
+    async def insert_users(self, users: List[dict]) -> Tuple[int, List[Dict[str, Any]]]: ...
+
+    @abstractmethod
+    async def count_users(self) -> int: ...
+
+    @abstractmethod
+    def iter_users(self, batch_size: int = 1000) -> AsyncIterator[dict]:
+        # Ordered by user_id, the same order iter_notifications uses
+        ...
+
+    @abstractmethod
+    async def update_settings(self, user_id: str, settings: dict): ...
+
+    @abstractmethod
+    async def set_stats(self, user_id: str, stats: dict): ...
+
+    @abstractmethod
+    async def increment_sessions(self, user_id: str): ...
+
+    @abstractmethod
+    async def add_affirmation(self, user_id: str, affirmation: dict): ...
+
+    @abstractmethod
+    async def add_achievements(self, user_id: str, achievements: List[dict]):
+        # Achievements whose id is already present are skipped individually
+        ...
+
+    @abstractmethod
+    async def set_streak(self, user_id: str, consecutive_days: int, last_usage_date: str):
+        # Skipped when the stored last_usage_date is newer than last_usage_date
+        ...
+
+    @abstractmethod
+    async def apply_stats_deltas(self, deltas: Dict[str, dict]) -> List[str]:
+        # deltas: user_id -> {daily_usage, total_manifested, last_usage_date,
+        # consecutive_days} as coalesced by the stats buffer. daily_usage is added
+        # when the stored last_usage_date matches and replaces it otherwise, decided
+        # atomically per user. Returns the user_ids whose delta was not applied.
+        ...
+
+    # Notifications
+    @abstractmethod
+    async def insert_notification(self, notification: dict): ...
+
+    @abstractmethod
+    def iter_notifications(self, user_id: Optional[str] = None, batch_size: int = 1000) -> AsyncIterator[dict]:
+        # Ordered by user_id, then timestamp
+        ...
+
+    @abstractmethod
+    async def total_manifested(self) -> float: ...
+
+    # Social proof
+    @abstractmethod
+    async def insert_stories(self, stories: List[dict]) -> Tuple[int, List[Dict[str, Any]]]: ...
+
+    @abstractmethod
+    async def recent_stories(self, limit: int) -> List[dict]: ...
+
+    # Presence
+    @abstractmethod
+    async def save_presence(self, worker_id: str, buckets: dict): ...
+
+    @abstractmethod
+    async def load_presence(self, exclude_worker_id: str, since: datetime) -> List[dict]: ...
+
+
+# MongoDB
+READ_PREFERENCE_MODES = {
+    "primary": Primary,
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest,
+}
+
+def build_read_preference(mode: str, max_staleness: int = -1):
+    if mode not in READ_PREFERENCE_MODES:
+        raise ValueError(f"Unknown read preference: {mode}")
+    if mode == "primary":
+        return Primary()
+    return READ_PREFERENCE_MODES[mode](max_staleness=max_staleness)
+
+STORY_FIELDS = ("amount", "code", "description", "created_at")
+
+
+class MotorStorage(StorageBackend):
+    # Read routing. Auth, generate and anything that writes stays on the primary;
+    # public and analytics reads may go to secondaries with bounded staleness
+    # (MongoDB requires maxStalenessSeconds >= 90, -1 disables it).
+    def __init__(self, url: str, db_name: str = "digimanifest", read_routes: Optional[Dict[str, str]] = None,
+                 max_staleness: int = -1, **client_options):
+        self.url = url
+        self.db_name = db_name
+        self.read_routes = read_routes or {}
+        self.max_staleness = max_staleness
+        self.client_options = client_options
+        self.client = None
+        self.database = None
+        self.read_databases = {}
+
+    async def connect(self):
+        self.client = AsyncIOMotorClient(self.url, **self.client_options)
+        self.database = self.client[self.db_name]
+        self.read_databases = {
+            route: self.database.with_options(read_preference=build_read_preference(mode, self.max_staleness))
+            for route, mode in self.read_routes.items()
+        }
+
+    async def close(self):
+        if self.client:
+            self.client.close()
+
+    def read_db(self, route: str):
+        return self.read_databases.get(route, self.database)
+
+    async def ensure_indexes(self):
+        await self.database.users.create_index("email", unique=True)
+        await self.database.users.create_index("user_id", unique=True)
+        await self.database.notifications.create_index([("user_id", 1), ("timestamp", 1)])
+        await self.database.social_proof.create_index("content_hash", unique=True, sparse=True)
+        await self.database.social_proof.create_index("created_at")
+
+    async def ping(self):
+        await self.database.command("ping")
+
+    async def get_user(self, user_id: str) -> Optional[dict]:
+        return await self.database.users.find_one({"user_id": user_id})
+
+    async def get_user_by_email(self, email: str) -> Optional[dict]:
+        return await self.database.users.find_one({"email": email})
+
+    async def insert_user(self, user: dict):
+        try:
+            await self.database.users.insert_one(dict(user))
+        except MongoDuplicateKeyError as e:
+            raise DuplicateKeyError(str(e))
+
+    async def _insert_many(self, collection, documents: List[dict]) -> Tuple[int, List[Dict[str, Any]]]:
+        if not documents:
+            return 0, []
+        # insert_many adds _id to the documents it is given
+        documents = [dict(document) for document in documents]
+        try:
+            result = await collection.insert_many(documents, ordered=False)
+            return len(result.inserted_ids), []
+        except BulkWriteError as e:
+            errors = [
+                insert_error(write_error["index"], write_error.get("code") == 11000, write_error.get("errmsg", "Insert failed"))
+                for write_error in e.details.get("writeErrors", [])
+            ]
+            return e.details.get("nInserted", 0), errors
+
+    async def insert_users(self, users: List[dict]) -> Tuple[int, List[Dict[str, Any]]]:
+        return await self._insert_many(self.database.users, users)
+
+    async def count_users(self) -> int:
+        return await self.read_db("analytics").users.count_documents({})
+
+    async def iter_users(self, batch_size: int = 1000) -> AsyncIterator[dict]:
+        cursor = self.read_db("analytics").users.find(
+            {}, {"_id": 0, "password": 0}
+        ).sort("user_id", 1).batch_size(batch_size)
+        async for user in cursor:
+            yield user
+
+    async def update_settings(self, user_id: str, settings: dict):
+        await self.database.users.update_one({"user_id": user_id}, {"$set": {"settings": settings}})
+
+    async def set_stats(self, user_id: str, stats: dict):
+        await self.database.users.update_one({"user_id": user_id}, {"$set": {"stats": stats}})
+
+    async def increment_sessions(self, user_id: str):
+        await self.database.users.update_one({"user_id": user_id}, {"$inc": {"stats.sessions_count": 1}})
+
+    async def add_affirmation(self, user_id: str, affirmation: dict):
+        await self.database.users.update_one({"user_id": user_id}, {"$push": {"custom_affirmations": affirmation}})
+
+    async def add_achievements(self, user_id: str, achievements: List[dict]):
+        if not achievements:
+            return
+        # One guarded push per achievement, so an id that is already present
+        # does not block the others
+        await self.database.users.bulk_write([
+            UpdateOne(
+                {"user_id": user_id, "achievements.id": {"$ne": achievement["id"]}},
+                {"$push": {"achievements": achievement}}
+            )
+            for achievement in achievements
+        ], ordered=False)
+
+    async def set_streak(self, user_id: str, consecutive_days: int, last_usage_date: str):
+        await self.database.users.update_one(
+            {
+                "user_id": user_id,
+                "$or": [{"stats.last_usage_date": None}, {"stats.last_usage_date": {"$lte": last_usage_date}}]
+            },
+            {"$set": {"stats.consecutive_days": consecutive_days, "stats.last_usage_date": last_usage_date}}
+        )
+
+    async def apply_stats_deltas(self, deltas: Dict[str, dict]) -> List[str]:
+        user_ids = list(deltas)
+        operations = []
+        for user_id in user_ids:
+            entry = deltas[user_id]
+            # Pipeline update: every expression sees the stored document, so the
+            # daily counter is only carried over when the stored day matches
+            same_day = {"$eq": ["$stats.last_usage_date", entry["last_usage_date"]]}
+            operations.append(UpdateOne({"user_id": user_id}, [{"$set": {
+                "stats.daily_usage": {"$cond": [
+                    same_day,
+                    {"$add": [{"$ifNull": ["$stats.daily_usage", 0]}, entry["daily_usage"]]},
+                    entry["daily_usage"]
+                ]},
+                "stats.total_manifested": {"$add": [{"$ifNull": ["$stats.total_manifested", 0]}, entry["total_manifested"]]},
+                "stats.last_usage_date": entry["last_usage_date"],
+                "stats.consecutive_days": entry["consecutive_days"]
+            }}]))
+        if not operations:
+            return []
+        try:
+            await self.database.users.bulk_write(operations, ordered=False)
+            return []
+        except BulkWriteError as e:
+            return [user_ids[write_error["index"]] for write_error in e.details.get("writeErrors", [])]
+
+    async def insert_notification(self, notification: dict):
+        await self.database.notifications.insert_one(dict(notification))
+
+    async def iter_notifications(self, user_id: Optional[str] = None, batch_size: int = 1000) -> AsyncIterator[dict]:
+        query = {"user_id": user_id} if user_id else {}
+        cursor = self.read_db("analytics").notifications.find(
+            query, {"_id": 0, "user_id": 1, "amount": 1, "timestamp": 1}
+        ).sort([("user_id", 1), ("timestamp", 1)]).batch_size(batch_size)
+        async for notification in cursor:
+            yield notification
+
+    async def total_manifested(self) -> float:
+        result = await self.read_db("analytics").notifications.aggregate([
+            {"$group": {"_id": None, "total": {"$sum": "$amount"}}}
+        ]).to_list(length=1)
+        return result[0]["total"] if result else 0
+
+    async def insert_stories(self, stories: List[dict]) -> Tuple[int, List[Dict[str, Any]]]:
+        return await self._insert_many(self.database.social_proof, stories)
+
+    async def recent_stories(self, limit: int) -> List[dict]:
+        projection = {"_id": 0, **{field: 1 for field in STORY_FIELDS}}
+        return await self.read_db("public").social_proof.find(
+            {}, projection
+        ).sort("created_at", -1).limit(limit).to_list(length=limit)
+
+    async def save_presence(self, worker_id: str, buckets: dict):
+        await self.database.presence.replace_one(
+            {"_id": worker_id},
+            {"_id": worker_id, "updated_at": datetime.utcnow(), "buckets": buckets},
+            upsert=True
+        )
+
+    async def load_presence(self, exclude_worker_id: str, since: datetime) -> List[dict]:
+        cursor = self.database.presence.find({"_id": {"$ne": exclude_worker_id}, "updated_at": {"$gte": since}})
+        return [worker.get("buckets", {}) async for worker in cursor]
+
+
+# SQLite
+# Documents are stored as JSON next to the columns that are indexed or
+# aggregated. datetime and bytes values are tagged so they round-trip.
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {"$date": value.isoformat()}
+    if isinstance(value, (bytes, bytearray)):
+        return {"$bytes": base64.b64encode(bytes(value)).decode("ascii")}
+    raise TypeError(f"Cannot store {type(value).__name__}")
+
+def _decode_object(obj):
+    if len(obj) == 1:
+        if "$date" in obj:
+            return datetime.fromisoformat(obj["$date"])
+        if "$bytes" in obj:
+            return base64.b64decode(obj["$bytes"])
+    return obj
+
+def dumps(document: dict) -> str:
+    return json.dumps(document, default=_encode_value, separators=(",", ":"))
+
+def loads(data: str) -> dict:
+    return json.loads(data, object_hook=_decode_object)
+
+def _timestamp(value) -> str:
+    # Fixed width so lexical order in SQLite matches chronological order
+    return value.isoformat(timespec="microseconds") if isinstance(value, datetime) else str(value or "")
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    user_id TEXT PRIMARY KEY,
+    email TEXT NOT NULL UNIQUE,
+    doc TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS notifications (
+    id INTEGER PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    amount REAL NOT NULL,
+    timestamp TEXT NOT NULL,
+    doc TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS notifications_user_timestamp ON notifications (user_id, timestamp, id);
+CREATE TABLE IF NOT EXISTS social_proof (
+    id INTEGER PRIMARY KEY,
+    content_hash TEXT UNIQUE,
+    created_at TEXT NOT NULL,
+    doc TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS social_proof_created_at ON social_proof (created_at);
+CREATE TABLE IF NOT EXISTS presence (
+    worker_id TEXT PRIMARY KEY,
+    updated_at TEXT NOT NULL,
+    buckets TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS presence_updated_at ON presence (updated_at);
+"""
+
+
+class SQLiteStorage(StorageBackend):
+    # All statements run on one connection owned by a single worker thread, so
+    # there is no lock contention and writes never wait on the network. Writes
+    # are committed in batches: after commit_batch_size statements or
+    # commit_interval seconds, whichever comes first, and on close.
+    def __init__(self, path: str, commit_interval: float = 0.05, commit_batch_size: int = 500):
+        self.path = path
+        self.commit_interval = commit_interval
+        self.commit_batch_size = commit_batch_size
+        self.executor = None
+        self.connection = None
+        self.uncommitted = 0
+        self.commit_handle = None
+
+    async def _run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    async def _write(self, fn, *args):
+        result = await self._run(fn, *args)
+        self.uncommitted += 1
+        if self.uncommitted >= self.commit_batch_size:
+            await self.commit()
+        elif self.commit_handle is None:
+            loop = asyncio.get_running_loop()
+            self.commit_handle = loop.call_later(self.commit_interval, lambda: loop.create_task(self.commit()))
+        return result
+
+    async def commit(self):
+        if self.commit_handle is not None:
+            self.commit_handle.cancel()
+            self.commit_handle = None
+        if self.uncommitted:
+            self.uncommitted = 0
+            await self._run(self.connection.commit)
+
+    def _open(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        connection = sqlite3.connect(self.path, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute("PRAGMA temp_store=MEMORY")
+        connection.execute("PRAGMA cache_size=-65536")
+        connection.executescript(SQLITE_SCHEMA)
+        return connection
+
+    async def connect(self):
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-storage")
+        self.connection = await self._run(self._open)
+
+    async def close(self):
+        if self.connection is None:
+            return
+        await self.commit()
+        await self._run(self.connection.close)
+        self.connection = None
+        self.executor.shutdown(wait=True)
+
+    async def ensure_indexes(self):
+        def create():
+            self.connection.executescript(SQLITE_SCHEMA)
+        await self._run(create)
+
+    async def ping(self):
+        await self._run(lambda: self.connection.execute("SELECT 1").fetchone())
+
+    # Users
+    def _load_user(self, column: str, value: str) -> Optional[dict]:
+        row = self.connection.execute(f"SELECT doc FROM users WHERE {column} = ?", (value,)).fetchone()
+        return loads(row[0]) if row else None
+
+    async def get_user(self, user_id: str) -> Optional[dict]:
+        return await self._run(self._load_user, "user_id", user_id)
+
+    async def get_user_by_email(self, email: str) -> Optional[dict]:
+        return await self._run(self._load_user, "email", email)
+
+    def _insert_user_row(self, user: dict):
+        self.connection.execute(
+            "INSERT INTO users (user_id, email, doc) VALUES (?, ?, ?)",
+            (user["user_id"], user["email"], dumps(user))
+        )
+
+    async def insert_user(self, user: dict):
+        try:
+            await self._write(self._insert_user_row, user)
+        except sqlite3.IntegrityError as e:
+            raise DuplicateKeyError(str(e))
+
+    def _insert_rows(self, insert, documents: List[dict]) -> Tuple[int, List[Dict[str, Any]]]:
+        inserted = 0
+        errors = []
+        for index, document in enumerate(documents):
+            try:
+                insert(document)
+                inserted += 1
+            except sqlite3.IntegrityError as e:
+                errors.append(insert_error(index, "UNIQUE" in str(e), str(e)))
+        return inserted, errors
+
+    async def insert_users(self, users: List[dict]) -> Tuple[int, List[Dict[str, Any]]]:
+        result = await self._run(self._insert_rows, self._insert_user_row, users)
+        self.uncommitted += len(users)
+        await self.commit()
+        return result
+
+    async def count_users(self) -> int:
+        return await self._run(lambda: self.connection.execute("SELECT COUNT(*) FROM users").fetchone()[0])
+
+    async def iter_users(self, batch_size: int = 1000) -> AsyncIterator[dict]:
+        # Keyset pagination on the primary key, like iter_notifications
+        last = ""
+        while True:
+            params = (last, batch_size)
+            rows = await self._run(lambda: self.connection.execute(
+                "SELECT user_id, doc FROM users WHERE user_id > ? ORDER BY user_id LIMIT ?", params
+            ).fetchall())
+            for _, doc in rows:
+                user = loads(doc)
+                user.pop("password", None)
+                yield user
+            if len(rows) < batch_size:
+                return
+            last = rows[-1][0]
+
+    def _update_user(self, user_id: str, update) -> bool:
+        user = self._load_user("user_id", user_id)
+        if user is None:
+            return False
+        if update(user) is False:
+            return False
+        self.connection.execute("UPDATE users SET doc = ? WHERE user_id = ?", (dumps(user), user_id))
+        return True
+
+    async def update_settings(self, user_id: str, settings: dict):
+        await self._write(self._update_user, user_id, lambda user: user.update(settings=settings))
+
+    async def set_stats(self, user_id: str, stats: dict):
+        await self._write(self._update_user, user_id, lambda user: user.update(stats=stats))
+
+    async def increment_sessions(self, user_id: str):
+        def update(user):
+            stats = user.setdefault("stats", {})
+            stats["sessions_count"] = stats.get("sessions_count", 0) + 1
+        await self._write(self._update_user, user_id, update)
+
+    async def add_affirmation(self, user_id: str, affirmation: dict):
+        await self._write(self._update_user, user_id, lambda user: user.setdefault("custom_affirmations", []).append(affirmation))
+
+    async def add_achievements(self, user_id: str, achievements: List[dict]):
+        def update(user):
+            existing = {a["id"] for a in user.get("achievements", [])}
+            missing = [a for a in achievements if a["id"] not in existing]
+            if not missing:
+                return False
+            user.setdefault("achievements", []).extend(missing)
+        await self._write(self._update_user, user_id, update)
+
+    async def set_streak(self, user_id: str, consecutive_days: int, last_usage_date: str):
+        def update(user):
+            stats = user.setdefault("stats", {})
+            stored = stats.get("last_usage_date")
+            if stored is not None and stored > last_usage_date:
+                return False
+            stats["consecutive_days"] = consecutive_days
+            stats["last_usage_date"] = last_usage_date
+        await self._write(self._update_user, user_id, update)
+
+    async def apply_stats_deltas(self, deltas: Dict[str, dict]) -> List[str]:
+        def apply_all():
+            failed = []
+            for user_id, entry in deltas.items():
+                def update(user):
+                    stats = user.setdefault("stats", {})
+                    if stats.get("last_usage_date") == entry["last_usage_date"]:
+                        stats["daily_usage"] = stats.get("daily_usage", 0) + entry["daily_usage"]
+                    else:
+                        stats["daily_usage"] = entry["daily_usage"]
+                    stats["last_usage_date"] = entry["last_usage_date"]
+                    stats["consecutive_days"] = entry["consecutive_days"]
+                    stats["total_manifested"] = stats.get("total_manifested", 0) + entry["total_manifested"]
+                try:
+                    self._update_user(user_id, update)
+                except sqlite3.Error:
+                    failed.append(user_id)
+            return failed
+        failed = await self._run(apply_all)
+        self.uncommitted += len(deltas)
+        await self.commit()
+        return failed
+
+    # Notifications
+    async def insert_notification(self, notification: dict):
+        await self._write(
+            self.connection.execute,
+            "INSERT INTO notifications (user_id, amount, timestamp, doc) VALUES (?, ?, ?, ?)",
+            (notification["user_id"], notification["amount"], _timestamp(notification.get("timestamp")), dumps(notification))
+        )
+
+    async def iter_notifications(self, user_id: Optional[str] = None, batch_size: int = 1000) -> AsyncIterator[dict]:
+        # Keyset pagination, so writes can be interleaved between batches
+        last = ("", "", 0)
+        user_filter = "AND user_id = ?" if user_id else ""
+        while True:
+            params = list(last) + ([user_id] if user_id else []) + [batch_size]
+            rows = await self._run(lambda: self.connection.execute(
+                f"SELECT user_id, timestamp, id, amount FROM notifications "
+                f"WHERE (user_id, timestamp, id) > (?, ?, ?) {user_filter} "
+                f"ORDER BY user_id, timestamp, id LIMIT ?",
+                params
+            ).fetchall())
+            for row_user_id, timestamp, row_id, amount in rows:
+                yield {"user_id": row_user_id, "amount": amount, "timestamp": datetime.fromisoformat(timestamp)}
+            if len(rows) < batch_size:
+                return
+            last = rows[-1][:3]
+
+    async def total_manifested(self) -> float:
+        return await self._run(lambda: self.connection.execute("SELECT COALESCE(SUM(amount), 0) FROM notifications").fetchone()[0])
+
+    # Social proof
+    def _insert_story_row(self, story: dict):
+        self.connection.execute(
+            "INSERT INTO social_proof (content_hash, created_at, doc) VALUES (?, ?, ?)",
+            (story.get("content_hash"), _timestamp(story.get("created_at")), dumps(story))
+        )
+
+    async def insert_stories(self, stories: List[dict]) -> Tuple[int, List[Dict[str, Any]]]:
+        result = await self._run(self._insert_rows, self._insert_story_row, stories)
+        self.uncommitted += len(stories)
+        await self.commit()
+        return result
+
+    async def recent_stories(self, limit: int) -> List[dict]:
+        rows = await self._run(lambda: self.connection.execute(
+            "SELECT doc FROM social_proof ORDER BY created_at DESC LIMIT ?", (limit,)
+        ).fetchall())
+        return [{field: story.get(field) for field in STORY_FIELDS} for story in (loads(row[0]) for row in rows)]
+
+    # Presence
+    async def save_presence(self, worker_id: str, buckets: dict):
+        await self._write(
+            self.connection.execute,
+            "INSERT OR REPLACE INTO presence (worker_id, updated_at, buckets) VALUES (?, ?, ?)",
+            (worker_id, _timestamp(datetime.utcnow()), dumps(buckets))
+        )
+
+    async def load_presence(self, exclude_worker_id: str, since: datetime) -> List[dict]:
+        rows = await self._run(lambda: self.connection.execute(
+            "SELECT buckets FROM presence WHERE worker_id != ? AND updated_at >= ?",
+            (exclude_worker_id, _timestamp(since))
+        ).fetchall())
+        return [loads(row[0]) for row in rows]
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+DigiManifest storage backend test suite
+Runs the same checks against every storage backend
+SQLite always runs; MongoDB runs when MONGO_URL answers a ping
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from storage import MotorStorage, SQLiteStorage, DuplicateKeyError
+
+
+class StorageTester:
+    def __init__(self, name, storage):
+        self.name = name
+        self.storage = storage
+        self.tests_run = 0
+        self.tests_passed = 0
+
+    def log_test(self, name, success, details=""):
+        """Log test results"""
+        self.tests_run += 1
+        if success:
+            self.tests_passed += 1
+            print(f"✅ [{self.name}] {name} - PASSED {details}")
+        else:
+            print(f"❌ [{self.name}] {name} - FAILED {details}")
+        return success
+
+    @staticmethod
+    def new_user(email=None):
+        user_id = str(uuid.uuid4())
+        return {
+            "user_id": user_id,
+            "email": email or f"{user_id}@example.com",
+            "name": "Storage Test",
+            "password": "hash",
+            "is_pro": False,
+            "created_at": datetime.utcnow().replace(microsecond=0),
+            "settings": {"min_amount": 10.0},
+            "stats": {"total_manifested": 0.0, "sessions_count": 0, "daily_usage": 0, "last_usage_date": None},
+            "achievements": [],
+            "custom_affirmations": []
+        }
+
+    async def test_users(self):
+        user = self.new_user()
+        await self.storage.insert_user(user)
+        loaded = await self.storage.get_user(user["user_id"])
+        by_email = await self.storage.get_user_by_email(user["email"])
+        self.log_test("Insert And Get User", loaded is not None and loaded["email"] == user["email"]
+                      and loaded["created_at"] == user["created_at"] and by_email["user_id"] == user["user_id"])
+
+        try:
+            await self.storage.insert_user(self.new_user(email=user["email"]))
+            self.log_test("Duplicate Email Rejected", False, "Insert succeeded")
+        except DuplicateKeyError:
+            self.log_test("Duplicate Email Rejected", True)
+
+        batch = [self.new_user(), self.new_user(email=user["email"]), self.new_user()]
+        inserted, errors = await self.storage.insert_users(batch)
+        self.log_test("Bulk Insert Reports Rows", inserted == 2 and len(errors) == 1
+                      and errors[0]["index"] == 1 and errors[0]["duplicate"], f"Inserted: {inserted}, Errors: {errors}")
+
+        await self.storage.update_settings(user["user_id"], {"min_amount": 25.0})
+        await self.storage.increment_sessions(user["user_id"])
+        await self.storage.add_affirmation(user["user_id"], {"text": "I am abundant", "code": "5207418", "created_at": datetime.utcnow()})
+        achievement = {"id": "first_manifestation", "name": "First Spark", "description": "", "icon": "✨", "unlocked_at": datetime.utcnow()}
+        await self.storage.add_achievements(user["user_id"], [achievement])
+        await self.storage.add_achievements(user["user_id"], [achievement])
+        loaded = await self.storage.get_user(user["user_id"])
+        self.log_test("User Updates", loaded["settings"]["min_amount"] == 25.0 and loaded["stats"]["sessions_count"] == 1
+                      and len(loaded["custom_affirmations"]) == 1 and len(loaded["achievements"]) == 1)
+
+        # A batch overlapping an existing id still adds the new achievements
+        streak = dict(achievement, id="streak_3", name="Committed")
+        await self.storage.add_achievements(user["user_id"], [achievement, streak])
+        loaded = await self.storage.get_user(user["user_id"])
+        ids = [a["id"] for a in loaded["achievements"]]
+        self.log_test("Achievements Partial Overlap", ids == ["first_manifestation", "streak_3"], f"Ids: {ids}")
+
+        await self.storage.apply_stats_deltas({user["user_id"]: {
+            "daily_usage": 3, "total_manifested": 30.0, "last_usage_date": "2024-01-01",
+            "consecutive_days": 1
+        }})
+        await self.storage.apply_stats_deltas({user["user_id"]: {
+            "daily_usage": 2, "total_manifested": 12.5, "last_usage_date": "2024-01-01",
+            "consecutive_days": 1
+        }})
+        same_day = (await self.storage.get_user(user["user_id"]))["stats"]["daily_usage"]
+        await self.storage.apply_stats_deltas({user["user_id"]: {
+            "daily_usage": 1, "total_manifested": 2.5, "last_usage_date": "2024-01-02", "consecutive_days": 2
+        }})
+        stats = (await self.storage.get_user(user["user_id"]))["stats"]
+        self.log_test("Stats Deltas", same_day == 5 and stats["daily_usage"] == 1 and stats["total_manifested"] == 45.0
+                      and stats["last_usage_date"] == "2024-01-02" and stats["sessions_count"] == 1, f"Stats: {stats}")
+
+        await self.storage.set_streak(user["user_id"], 4, "2024-01-03")
+        await self.storage.set_streak(user["user_id"], 2, "2023-12-30")
+        stats = (await self.storage.get_user(user["user_id"]))["stats"]
+        self.log_test("Set Streak Keeps Newer Day", stats["consecutive_days"] == 4
+                      and stats["last_usage_date"] == "2024-01-03", f"Stats: {stats}")
+
+        await self.storage.set_stats(user["user_id"], {"total_manifested": 1.0})
+        stats = (await self.storage.get_user(user["user_id"]))["stats"]
+        self.log_test("Set Stats", stats == {"total_manifested": 1.0})
+
+        count = await self.storage.count_users()
+        self.log_test("Count Users", count >= 3, f"Users: {count}")
+
+        users = [u async for u in self.storage.iter_users(batch_size=2)]
+        user_ids = [u["user_id"] for u in users]
+        self.log_test("Users Ordered By Id", len(users) == count and user_ids == sorted(user_ids)
+                      and all("password" not in u for u in users), f"Users: {len(users)}")
+
+    async def test_notifications(self):
+        user_ids = sorted(str(uuid.uuid4()) for _ in range(2))
+        start = datetime(2024, 1, 1)
+        before = await self.storage.total_manifested()
+        for offset in (3, 1, 2):
+            for user_id in user_ids:
+                await self.storage.insert_notification({
+                    "user_id": user_id, "amount": 10.0 * offset, "sender": "Universe", "bank": "Chase Bank",
+                    "manifestation_type": "⚡ Instant Transfer", "timestamp": start + timedelta(days=offset)
+                })
+
+        replayed = [n async for n in self.storage.iter_notifications(user_ids[0], batch_size=2)]
+        self.log_test("Notifications Ordered Per User", [n["amount"] for n in replayed] == [10.0, 20.0, 30.0]
+                      and all(n["user_id"] == user_ids[0] for n in replayed), f"Amounts: {[n['amount'] for n in replayed]}")
+
+        replayed = [n async for n in self.storage.iter_notifications(batch_size=2) if n["user_id"] in user_ids]
+        self.log_test("Notifications Ordered Globally", [n["user_id"] for n in replayed] == [user_ids[0]] * 3 + [user_ids[1]] * 3)
+
+        total = await self.storage.total_manifested()
+        self.log_test("Total Manifested", abs(total - before - 120.0) < 1e-6, f"Total: {total}")
+
+    async def test_stories(self):
+        now = datetime.utcnow().replace(microsecond=0)
+        tag = str(uuid.uuid4())
+        stories = [
+            {"amount": 10.0, "code": "5207418", "description": f"older {tag}", "user_id": "u", "content_hash": f"{tag}-1", "created_at": now - timedelta(minutes=5)},
+            {"amount": 20.0, "code": "426499", "description": f"newer {tag}", "user_id": "u", "content_hash": f"{tag}-2", "created_at": now + timedelta(days=3650)},
+            {"amount": 10.0, "code": "5207418", "description": f"older {tag}", "user_id": "u", "content_hash": f"{tag}-1", "created_at": now},
+        ]
+        inserted, errors = await self.storage.insert_stories(stories)
+        self.log_test("Insert Stories Dedupes", inserted == 2 and [e["index"] for e in errors] == [2] and errors[0]["duplicate"])
+
+        recent = await self.storage.recent_stories(10)
+        self.log_test("Recent Stories", recent[0]["description"] == f"newer {tag}" and set(recent[0]) == {"amount", "code", "description", "created_at"})
+
+    async def test_presence(self):
+        worker = f"worker-{uuid.uuid4()}"
+        other = f"worker-{uuid.uuid4()}"
+        buckets = {"10": {str(int(time.time())): bytes([1, 2, 3])}}
+        await self.storage.save_presence(worker, buckets)
+        await self.storage.save_presence(other, buckets)
+        loaded = await self.storage.load_presence(worker, datetime.utcnow() - timedelta(minutes=1))
+        self.log_test("Presence Round Trip", buckets in loaded and len(loaded) >= 1)
+
+    async def run(self):
+        await self.storage.connect()
+        try:
+            await self.storage.ensure_indexes()
+            await self.storage.ping()
+            await self.test_users()
+            await self.test_notifications()
+            await self.test_stories()
+            await self.test_presence()
+        finally:
+            await self.storage.close()
+        return self.tests_passed == self.tests_run
+
+
+async def mongo_available(url):
+    storage = MotorStorage(url, serverSelectionTimeoutMS=2000)
+    await storage.connect()
+    try:
+        await storage.ping()
+        return True
+    except Exception:
+        return False
+    finally:
+        await storage.close()
+
+
+async def run_all():
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        sqlite = SQLiteStorage(os.path.join(directory, "storage_test.db"))
+        results.append(await StorageTester("sqlite", sqlite).run())
+
+    mongo_url = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
+    if await mongo_available(mongo_url):
+        db_name = f"digimanifest_storage_test_{uuid.uuid4().hex[:8]}"
+        mongo = MotorStorage(mongo_url, db_name=db_name)
+        try:
+            results.append(await StorageTester("mongo", mongo).run())
+        finally:
+            await mongo.connect()
+            await mongo.client.drop_database(db_name)
+            await mongo.close()
+    else:
+        print(f"⚠️  MongoDB not reachable at {mongo_url} - skipping Motor backend")
+
+    return all(results)
+
+
+def main():
+    """Main test execution"""
+    print("🚀 Starting DigiManifest Storage Backend Tests")
+    print("=" * 50)
+    return 0 if asyncio.run(run_all()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+DigiManifest success story moderation test suite
+Checks moderation, publishing and the public feed against the SQLite backend
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import uuid
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+
+import server
+from server import StoryModerationQueue
+from storage import SQLiteStorage
+
+
+class FailingStorage(SQLiteStorage):
+    """SQLite backend whose story inserts can be made to fail"""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.fail_inserts = False
+
+    async def insert_stories(self, stories):
+        if self.fail_inserts:
+            raise RuntimeError("storage unavailable")
+        return await super().insert_stories(stories)
+
+
+def new_story(description="Found money in an old coat", amount=50.0, code="5207418", user_id=None, created_at=None):
+    return {
+        "amount": amount, "code": code, "description": description,
+        "user_id": user_id or str(uuid.uuid4()), "created_at": created_at or datetime.utcnow(),
+    }
+
+
+class StoryQueueTester:
+    def __init__(self, storage):
+        self.storage = storage
+        self.tests_run = 0
+        self.tests_passed = 0
+
+    def log_test(self, name, success, details=""):
+        """Log test results"""
+        self.tests_run += 1
+        if success:
+            self.tests_passed += 1
+            print(f"✅ {name} - PASSED {details}")
+        else:
+            print(f"❌ {name} - FAILED {details}")
+        return success
+
+    def test_content_checks(self):
+        cases = [
+            ("Zero Amount", new_story(amount=0), "amount out of range"),
+            ("Amount Too Large", new_story(amount=server.STORY_MAX_AMOUNT + 1), "amount out of range"),
+            ("Invalid Code", new_story(code="52a7"), "invalid code"),
+            ("Description Too Long", new_story(description="x" * (server.STORY_MAX_DESCRIPTION + 1)), "description too long"),
+            ("Link In Description", new_story(description="details at www.example.com"), "links are not allowed"),
+            ("Clean Story", new_story(), None),
+        ]
+        for name, story, reason in cases:
+            result = server.check_story_content(story)
+            self.log_test(f"Content Check: {name}", result == reason, f"Reason: {result}")
+
+        queue = StoryModerationQueue()
+        queue.moderate(new_story(amount=0))
+        queue.moderate(new_story(description="see https://example.org"))
+        self.log_test("Rejections Counted", queue.stats["rejected"] == 2 and not queue.approved
+                      and queue.rejections == {"amount out of range": 1, "links are not allowed": 1}, f"Rejections: {queue.rejections}")
+
+    def test_hash_dedupe(self):
+        queue = StoryModerationQueue()
+        user_id = str(uuid.uuid4())
+        queue.moderate(new_story("Found money  in an old coat", user_id=user_id))
+        queue.moderate(new_story("found money in an OLD coat", user_id=user_id))
+        queue.moderate(new_story("Found money in an old coat"))
+        self.log_test("Duplicate Content Hash Dropped", len(queue.approved) == 2 and queue.stats["duplicates"] == 1,
+                      f"Stats: {queue.stats}")
+
+    async def test_index_dedupe(self):
+        # Two workers moderate the same story; the unique content_hash index keeps one copy
+        story = new_story(f"Raise approved {uuid.uuid4()}")
+        first, second = StoryModerationQueue(), StoryModerationQueue()
+        first.moderate(dict(story))
+        await first.publish()
+        second.moderate(dict(story))
+        second.moderate(new_story(f"Unrelated {uuid.uuid4()}"))
+        await second.publish()
+        self.log_test("Duplicate Across Batches", first.stats["published"] == 1 and second.stats["published"] == 1
+                      and second.stats["duplicates"] == 1 and not second.approved, f"Stats: {second.stats}")
+
+    async def test_publish_failure(self):
+        queue = StoryModerationQueue()
+        first, later = new_story(f"First {uuid.uuid4()}"), new_story(f"Later {uuid.uuid4()}")
+        queue.moderate(first)
+
+        self.storage.fail_inserts = True
+        try:
+            await queue.publish()
+            self.log_test("Failed Publish Raises", False, "Publish succeeded")
+        except RuntimeError:
+            self.log_test("Failed Publish Raises", True)
+        finally:
+            self.storage.fail_inserts = False
+
+        queue.moderate(later)
+        kept = [story["description"] for story in queue.approved]
+        self.log_test("Failed Batch Put Back In Order", kept == [first["description"], later["description"]], f"Approved: {kept}")
+
+        await queue.publish()
+        self.log_test("Failed Batch Retried", queue.stats["published"] == 2 and not queue.approved, f"Stats: {queue.stats}")
+
+    async def test_feed(self):
+        now = datetime.utcnow() + timedelta(days=1)
+        stories = [new_story(f"Feed {i} {uuid.uuid4()}", created_at=now + timedelta(minutes=i))
+                   for i in range(server.SUCCESS_STORY_FEED_SIZE + 2)]
+        publisher = StoryModerationQueue()
+        for story in stories[:-1]:
+            publisher.moderate(story)
+        await publisher.publish()
+
+        queue = StoryModerationQueue()
+        feed = await queue.get_feed()
+        expected = [story["description"] for story in reversed(stories[1:-1])]
+        self.log_test("Feed Newest First", [story["description"] for story in feed] == expected
+                      and all(set(story) == {"amount", "code", "description", "created_at"} for story in feed))
+
+        queue.moderate(stories[-1])
+        await queue.publish()
+        feed = await queue.get_feed()
+        self.log_test("Published Stories Merged Into Feed", feed[0]["description"] == stories[-1]["description"]
+                      and len(feed) == server.SUCCESS_STORY_FEED_SIZE)
+
+        # Published by another worker: only picked up once the feed expires
+        other = new_story(f"Other worker {uuid.uuid4()}", created_at=now + timedelta(hours=1))
+        publisher.moderate(other)
+        await publisher.publish()
+        cached = (await queue.get_feed())[0]["description"]
+        queue.feed_loaded_at -= server.STORY_FEED_TTL
+        reloaded = (await queue.get_feed())[0]["description"]
+        self.log_test("Feed Reloads After TTL", cached != other["description"] and reloaded == other["description"])
+
+    async def test_drain(self):
+        queue = StoryModerationQueue()
+        queue.start(2)
+        story = new_story(f"Drained {uuid.uuid4()}")
+        queue.submit(story)
+        await queue.stop()
+        self.log_test("Stop Drains And Publishes", queue.stats["published"] == 1 and not queue.tasks, f"Stats: {queue.stats}")
+
+    def test_queue_full(self, client):
+        email = f"{uuid.uuid4()}@example.com"
+        token = client.post("/api/auth/register", json={"email": email, "name": "Story Test", "password": "secret1"}).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        original = server.story_queue
+        # No workers are started, so the second submission finds the queue full
+        server.story_queue = StoryModerationQueue(maxsize=1)
+        try:
+            payload = {"amount": 25.0, "code": "5207418", "description": "Queued"}
+            accepted = client.post("/api/social-proof/submit", json=payload, headers=headers)
+            rejected = client.post("/api/social-proof/submit", json=payload, headers=headers)
+            self.log_test("Full Queue Returns 503", accepted.status_code == 202 and rejected.status_code == 503,
+                          f"Statuses: {accepted.status_code}, {rejected.status_code}")
+        finally:
+            server.story_queue = original
+
+    async def run(self):
+        await self.storage.connect()
+        server.storage = self.storage
+        try:
+            await self.storage.ensure_indexes()
+            self.test_content_checks()
+            self.test_hash_dedupe()
+            await self.test_index_dedupe()
+            await self.test_publish_failure()
+            await self.test_feed()
+            await self.test_drain()
+        finally:
+            await self.storage.close()
+
+
+def main():
+    """Main test execution"""
+    print("🚀 Starting DigiManifest Success Story Queue Tests")
+    print("=" * 50)
+    with tempfile.TemporaryDirectory() as directory:
+        tester = StoryQueueTester(FailingStorage(os.path.join(directory, "story_queue_test.db")))
+        asyncio.run(tester.run())
+
+        server.create_storage = lambda: SQLiteStorage(os.path.join(directory, "story_api_test.db"))
+        with TestClient(server.app) as client:
+            tester.test_queue_full(client)
+
+    print(f"\n📊 Test Results: {tester.tests_passed}/{tester.tests_run} tests passed")
+    return 0 if tester.tests_passed == tester.tests_run else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())